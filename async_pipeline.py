@@ -0,0 +1,198 @@
+"""
+**********************************************************************************
+File: async_pipeline.py
+
+Description:
+This module implements an asyncio pipeline processing the HTML files in four
+overlapping stages connected by bounded queues:
+
+1. Discovery: streams the file paths into the path queue.
+2. Readers: several tasks loading the file bytes concurrently through a thread pool.
+3. Parsers: tasks parsing the bytes in an executor (threads or worker processes).
+4. Writer: a single coroutine handing the reports, in file order, to the write callback.
+
+The bounded queues give backpressure between the stages, so the disk keeps reading
+while the CPU parses and the writer appends rows. The number of files between
+discovery and the writer is also bounded, which bounds the reordering buffer of the writer.
+
+Classes:
+- PipelineStats: Holds the current and maximum depth of every pipeline queue.
+
+Functions:
+- read_file_bytes: Reads the content of a file.
+- run_pipeline: Runs the pipeline on a list of files (blocking).
+
+**********************************************************************************
+"""
+
+# Imports
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from extraction_backends import extract_compact
+
+# Sentinel put in a queue when the previous stage is finished
+end_of_stage = None
+
+
+# Classes
+class PipelineStats:
+    """
+    Holds the current and maximum depth of every pipeline queue and the number of written files.
+    """
+
+    def __init__(self, queues):
+        self.queues = queues                               # Dict of queue name -> asyncio.Queue
+        self.max_depths = {name: 0 for name in queues}     # Maximum depth reached by every queue
+        self.written_files = 0                             # Number of files handed to the writer
+
+    def update(self):
+        """
+        Updates the maximum depths with the current depth of every queue.
+
+        Returns:
+            dict: The current depth of every queue.
+        """
+        depths = self.current_depths()
+        for name, depth in depths.items():
+            self.max_depths[name] = max(self.max_depths[name], depth)
+        return depths
+
+    def current_depths(self):
+        """
+        Returns the current depth of every queue.
+
+        Returns:
+            dict: Queue name -> number of items waiting in the queue.
+        """
+        return {name: queue.qsize() for name, queue in self.queues.items()}
+
+
+# Functions
+def read_file_bytes(file_path):
+    """
+    Reads the content of a file.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        bytes: The content of the file.
+    """
+    with open(file_path, 'rb') as input_file:
+        return input_file.read()
+
+
+async def process_files(file_paths, parse_bytes, write_report, readers, queue_size, parse_executor, on_progress):
+    """
+    Runs the pipeline stages on the given files. See run_pipeline for the arguments.
+
+    Returns:
+        PipelineStats: The queue depth statistics of the run.
+    """
+    loop = asyncio.get_running_loop()
+    path_queue = asyncio.Queue(maxsize=queue_size)
+    data_queue = asyncio.Queue(maxsize=queue_size)
+    report_queue = asyncio.Queue(maxsize=queue_size)
+    stats = PipelineStats({"paths": path_queue, "data": data_queue, "reports": report_queue})
+    # Limits the number of files between discovery and the writer (bounds the reordering buffer)
+    in_flight = asyncio.Semaphore(queue_size * 3 + readers)
+    parsers = readers
+    io_executor = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='pipeline-reader')
+    write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-writer')
+
+    async def discover():
+        for index, file_path in enumerate(file_paths):
+            await in_flight.acquire()
+            await path_queue.put((index, file_path))
+        for _ in range(readers):
+            await path_queue.put(end_of_stage)
+
+    async def read():
+        while True:
+            item = await path_queue.get()
+            if item is end_of_stage:
+                return
+            index, file_path = item
+            data = await loop.run_in_executor(io_executor, read_file_bytes, file_path)
+            await data_queue.put((index, file_path, data))
+
+    async def parse():
+        while True:
+            item = await data_queue.get()
+            if item is end_of_stage:
+                return
+            index, file_path, data = item
+            report = await loop.run_in_executor(parse_executor, parse_bytes, data)
+            await report_queue.put((index, file_path, report))
+
+    async def write():
+        pending = {}            # Reports that arrived before the reports of the previous files
+        next_index = 0
+        while True:
+            item = await report_queue.get()
+            if item is end_of_stage:
+                return
+            index, file_path, report = item
+            pending[index] = (file_path, report)
+            while next_index in pending:
+                file_path, report = pending.pop(next_index)
+                await loop.run_in_executor(write_executor, write_report, file_path, report)
+                next_index += 1
+                in_flight.release()
+                stats.written_files += 1
+                depths = stats.update()
+                if on_progress:
+                    on_progress(stats.written_files, depths)
+
+    async def finish_stage(tasks, next_queue, count):
+        await asyncio.gather(*tasks)
+        for _ in range(count):
+            await next_queue.put(end_of_stage)
+
+    reader_tasks = [asyncio.create_task(read()) for _ in range(readers)]
+    parser_tasks = [asyncio.create_task(parse()) for _ in range(parsers)]
+    tasks = [asyncio.create_task(discover()), *reader_tasks, *parser_tasks, asyncio.create_task(write()),
+             asyncio.create_task(finish_stage(reader_tasks, data_queue, parsers)),
+             asyncio.create_task(finish_stage(parser_tasks, report_queue, 1))]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # Stop the remaining stages if any stage failed
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        io_executor.shutdown(wait=True, cancel_futures=True)
+        write_executor.shutdown(wait=True)
+    return stats
+
+
+def run_pipeline(file_paths, parse_bytes, write_report, readers=4, queue_size=32, parse_executor=None,
+                 on_progress=None):
+    """
+    Runs the asyncio pipeline on a list of files and blocks until all the reports are written.
+
+    Args:
+        file_paths (iterable): The paths of the HTML files, streamed by the discovery stage.
+        parse_bytes (callable): Picklable function taking the bytes of a file and returning a ReportTable.
+        write_report (callable): Function called with (file_path, report) for every file, in file order.
+                                 It is called from a single writer thread.
+        readers (int): The number of concurrent reader tasks (and parser tasks).
+        queue_size (int): The maximum number of items in every queue.
+        parse_executor (concurrent.futures.Executor): The executor parsing the files. A ProcessPoolExecutor
+                                                      spreads the parsing over the CPU cores. By default a
+                                                      single thread parses the files.
+        on_progress (callable): Optional function called with (written_files, queue_depths) after every file.
+
+    Returns:
+        PipelineStats: The queue depth statistics of the run.
+    """
+    own_executor = parse_executor is None
+    if own_executor:
+        parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-parser')
+    try:
+        return asyncio.run(process_files(file_paths, partial(extract_compact, parse_bytes), write_report,
+                                         readers, queue_size, parse_executor, on_progress))
+    finally:
+        if own_executor:
+            parse_executor.shutdown(wait=True)
@@ -6,6 +6,7 @@ import sys
 from PyQt5.QtWidgets import QMessageBox, QFileDialog, QProgressBar
 import openpyxl
 from openpyxl.styles import Font, Alignment, PatternFill
+from excel_autofit import AutofitTracker
 import os
 import time
 import sys
@@ -26,12 +27,38 @@ global progress_bar_counter            # Global variable holding the current pro
 progress_bar_counter = 0               # Initalizing the progress bar counter to 0
 global progress_bar_step               # Global variable for the step of the progress bar based on the number of files to process
 global files_list                      # Global list of files that contains the file names of the selected directory.
-options = Options()                    # Initalizing options variable to contain chrome driver options.
-options.add_argument('--headless=new') # Headless option to run chrome in silent mode.
-driver = webdriver.Chrome(options)     # Initalizing the WebDriver to google chrome with the created options.
+driver = None                          # WebDriver instance for google chrome, created on first use by get_driver().
 test_results_excel_file = "Tests_Results.xlsx" # Global Variable holding the output excel file name
 
 
+def get_driver():
+    """
+    Returns the headless Chrome WebDriver, starting it on first use.
+
+    Returns:
+        selenium.webdriver.Chrome: The WebDriver instance.
+    """
+    global driver
+    if driver is None:
+        options = Options()                    # Chrome driver options.
+        options.add_argument('--headless=new') # Headless option to run chrome in silent mode.
+        driver = webdriver.Chrome(options)
+    return driver
+
+
+def close_driver():
+    """
+    Quits the Chrome WebDriver if it was started.
+
+    Returns:
+        None
+    """
+    global driver
+    if driver is not None:
+        driver.quit()
+        driver = None
+
+
 # Check if Excel file exists
 def check_if_excel_exists(excel_file_name):
     if os.path.exists(excel_file_name):
@@ -75,39 +102,17 @@ def write_data_excel(excel_file_name, excel_data, styling_options):
             next_row = sheet.max_row
         else:
             next_row = sheet.max_row + 1
+        autofit_tracker = AutofitTracker()
         for row_data in excel_data:
             for col, data in enumerate(row_data, start=1):
                 cell = sheet.cell(row=next_row, column=col, value=data)
                 cell.font = styling_options.get('font')
                 cell.alignment = styling_options.get('alignment')
+            autofit_tracker.track_row(next_row, row_data, styling_options.get('font'))
             next_row += 1
         
-        # Autofitting the rows and columns the adjusted width and height formulas are obtained by trial and error and not accurate
-        # Autofit columns
-        for col in sheet.columns:
-            max_length = 0
-            column = col[0].column_letter  # Get column letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                        font_size = styling_options.get('font').size
-        
-                except:
-                    pass
-            adjusted_width = max_length * font_size / 12 + 2
-            sheet.column_dimensions[column].width = adjusted_width
-        # Autofit rows
-        for row in sheet.rows:
-            max_height = 0
-            for cell in row:
-                try:
-                    if len(str(cell.value)) > max_height:
-                        max_height = len(str(cell.value))
-                except:
-                    pass
-            adjusted_height = max_height * font_size / 12 + 2
-            sheet.row_dimensions[row[0].row].height = adjusted_height
+        # Autofitting the columns and rows with the sizes of the new rows only, the existing rows are not scanned again
+        autofit_tracker.apply(sheet, keep_wider_columns=True)
         
         workbook.save(excel_file_name)
 
@@ -189,9 +194,9 @@ class BackEndClass(QtWidgets.QWidget, Ui_MainWindow):
                     # Get full file name -> example: 'file://full_path/file_name'
                     full_file_name = 'file://' + dir_name + '/' + file
                     # open the file using chrome's driver
-                    driver.get(full_file_name)
+                    get_driver().get(full_file_name)
                     # finding the table, table headers and table entries by tag name
-                    table = driver.find_element(By.TAG_NAME, 'table')
+                    table = get_driver().find_element(By.TAG_NAME, 'table')
                     # Check if this is the first iteration to write the headers once in the excel file
                     if first_iteration:
                         headers = table.find_elements(By.TAG_NAME, 'th')
@@ -235,6 +240,9 @@ class BackEndClass(QtWidgets.QWidget, Ui_MainWindow):
         except Exception as e:
             print(e)
             QMessageBox.about(self, "Message", "Please Select a valid Directory with HTML files.")
+        finally:
+            # Quit the browser when the run ends
+            close_driver()
 
 
 if __name__ == "__main__":
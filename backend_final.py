@@ -7,345 +7,933 @@ Date: 29/7/2024
 Description:
 This script is designed to process HTML test result files, extract relevant data,
 and compile the results into an Excel file. The tool uses the PyQt5 library for 
-the graphical user interface, selenium for web automation, and openpyxl for 
-manipulating Excel files.
+the graphical user interface, a pure python HTML parser (or selenium for web
+automation) to read the HTML files, and openpyxl for manipulating Excel files.
 
 The script includes functionality for:
 - Checking if an Excel file exists and creating one if it doesn't.
-- Writing data to an Excel file.
+- Writing data to an Excel file, and optionally to CSV / JSON Lines files and a SQLite store (output_sinks.py).
 - Applying custom styles to Excel sheets.
-- Formatting cells based on specific search values.
+- Highlighting the passed and failed tests with conditional formatting.
+- Appending only the new and changed files to an existing Excel file (sources index, excel_sources.py).
+- Skipping the parsing of the unchanged reports with a persistent parse cache (parse_cache.py).
+- Processing several directories at the same time, every run owning its context (run_context.py).
+- Resuming an interrupted run from its last saved checkpoint with the journal of the run (run_journal.py).
+- Skipping the empty and malformed files with a pre-flight check before parsing (report_discovery.py).
+- Detecting the duplicate reports by content hash and skipping them or writing them as aliases (report_discovery.py).
 - Multi-threaded processing to ensure the GUI remains responsive during long operations.
 
 Classes:
+- ExcelWorkbookSession: Keeps the output Excel workbook in memory during a run and saves it once.
+- WriteOnlyExcelSession: Streams the styled output rows to the Excel file with constant memory.
 - Worker: Handles the background processing of HTML files.
 - BackEndClass: Manages the GUI interactions and starts the background thread.
 
 Functions:
-- check_if_excel_exists: Checks if an Excel file exists and returns an openpyxl Workbook object.
-- is_sheet_empty: Checks if a specified sheet in an Excel file is empty.
-- style_excel_sheet: Applies specified styling to the headers and data cells in an Excel sheet.
-- write_data_excel: Writes data to an Excel file.
-- format_cells_with_values: Formats cells in an Excel file that contain a specific search value.
+- register_named_styles: Registers the named styles of the Excel sheet in a workbook.
+- add_result_highlighting: Adds the conditional formatting highlighting the passed and failed tests.
+- run_from_command_line: Processes one or several directories of HTML files without opening the GUI.
 
 Global Variables:
-- dir_name: Holds the selected directory name.
-- number_of_files: Contains the number of HTML files in the directory.
-- progress_bar_counter: Holds the current progress bar counter.
-- progress_bar_step: Defines the step of the progress bar based on the number of files to process.
-- files_list: List containing the file names of the selected directory.
-- options: Holds the Chrome driver options.
-- driver: WebDriver instance for Google Chrome.
-- test_results_excel_file: Holds the output Excel file name.
+- test_summary_excel_file: Output Excel file name of the summary only mode (see run_context.py).
+- rows_per_write: Maximum number of rows of a (streamed) report written to the Excel file at once.
+- default_stream_threshold: Size in bytes from which the html_parser backend streams a report.
+- excel_modes: Available output modes of the Excel file (normal, write_only or stream).
+- parse_cache_file, default_parse_cache_max_size: File and default maximum size of the parse cache of the reports.
+- default_checkpoint_rows: Rows written before the first save of the Excel file in the GUI, so its runs can be resumed.
+- default_checkpoint_growth: Factor of the rows between two saves of the Excel file after every save in the GUI.
+- write_only_min_column_width: Minimum column width (characters) of the write only mode, which can't autofit the columns.
+- temp_file_extension: Extension of the temporary file replacing the Excel file when it is saved.
+- headers_style, data_style, passed_fill, failed_fill, passed_cases, failed_cases: Styling of the Excel sheet.
+- header_style_name, data_style_name: Named styles assigned to the cells when they are written.
+- overall_result_header: Header of the overall result column, highlighted with conditional formatting.
+- excel_max_rows: Maximum number of rows of an Excel sheet.
 
 Usage:
 1. Select a directory containing HTML test result files using the browse button.
 2. Click the start button to process the files and generate an Excel file.
 3. The status and progress will be updated in the GUI during processing.
-4. The results will be saved in an Excel file named "Tests_Results.xlsx".
+4. The results will be saved in an Excel file named "Tests_Results.xlsx" in the selected directory.
+   In summary only mode, one row per file with its overall result is saved in "Tests_Summary.xlsx".
 
 **********************************************************************************
 """
 
 # Imports
+import time
+startup_start_time = time.perf_counter()  # Used to measure the startup time of the GUI
 import openpyxl.workbook
 from front import Ui_MainWindow
 from PyQt5 import QtWidgets
 import sys
 from PyQt5.QtWidgets import QMessageBox, QFileDialog
-from PyQt5.QtCore import pyqtSignal, QObject, QThread
+from PyQt5.QtCore import pyqtSignal, QObject, QThread, QTimer, Qt
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.formatting.rule import CellIsRule
+from excel_autofit import AutofitTracker, character_widths, text_width, column_padding, shift_row_dimensions
+from xlsx_stream_writer import StreamingXlsxWriter
+from output_sinks import output_sinks, create_sink, ExcelSink, SinkFanOut
 import os
 import sys
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
+import argparse
+import threading
+from itertools import islice
+from functools import partial
+from collections import Counter
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from async_pipeline import run_pipeline
+from extraction_backends import (extraction_backends, available_backends, default_backend, get_backend,
+                                 extract_in_order, extract_safely, failed_extraction, ReportTable)
+from html_parser_backend import read_overall_result
+from parse_cache import ParseCache, decode_report
+from report_discovery import (preflight_reports, find_duplicate_reports, find_written_duplicates, original_file_key,
+                              duplicate_policies)
+from run_journal import RunJournal, read_journal, journal_extension
+from run_context import (RunContext, test_summary_excel_file, parse_cache_file, default_parse_cache_max_size,
+                         default_checkpoint_rows, default_checkpoint_growth)
+from excel_sources import (SourceEntry, file_signature, read_sources_index, load_sources_index, write_sources_index,
+                           split_changed_files, sources_sheet_name)
 
 # Global Variables
-global dir_name                        # Global variable to hold the selected directory name.
-global number_of_files                 # Global variable that contains the number of html files in the directory.
-number_of_files = 0                    # Initalizing the number of files global variable to 0 files
-global progress_bar_counter            # Global variable holding the current progress bar counter
-progress_bar_counter = 0               # Initalizing the progress bar counter to 0
-global progress_bar_step               # Global variable for the step of the progress bar based on the number of files to process
-global files_list                      # Global list of files that contains the file names of the selected directory.
-options = Options()                    # Initalizing options variable to contain chrome driver options.
-options.add_argument('--headless=new') # Headless option to run chrome in silent mode.
-driver = webdriver.Chrome(options)     # Initalizing the WebDriver to google chrome with the created options.
-test_results_excel_file = "Tests_Results.xlsx" # Global Variable holding the output excel file name
+# The directory, files, output paths and progress of a run are held by its RunContext (run_context.py)
+rows_per_write = 10000                         # Maximum number of rows of a report written to the excel file at once
+default_stream_threshold = 16 * 1024 * 1024    # Size (bytes) from which the html_parser backend streams a report
+excel_modes = ("normal", "write_only", "stream")  # Output modes of the excel file
+write_only_min_column_width = 30               # Minimum column width of the write only mode (set before the data is known)
+temp_file_extension = ".tmp"                   # Extension of the temporary file written by a save of the excel file
+
+# Styling of the Excel sheet
+# Headers Styling dict
+headers_style = {
+        "font": Font(name='Arial', size=12, bold=True),
+        "alignment": Alignment(horizontal='center', vertical='center'),
+        "fill": PatternFill(start_color='ADD8E6', end_color='ADD8E6', fill_type='solid')
+    }
+# Data Styling dict
+data_style = {
+    "font": Font(name='Arial', size=12, bold=False),
+    "alignment": Alignment(horizontal='center', vertical='center')
+}
+# Red highlight for the failed tests and green highlight for the passed tests
+passed_fill = PatternFill(start_color='00FF00', end_color='00FF00', fill_type='solid')
+failed_fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
+passed_cases = "Test Result : PASSED"
+failed_cases = "Test Result : FAILED"
+# Named styles registered once in the workbook and assigned to every cell when it is written
+header_style_name = "Test Header"
+data_style_name = "Test Data"
+overall_result_header = "Overall Result"  # Column highlighted by the passed / failed conditional formatting
+excel_max_rows = 1048576                  # Maximum number of rows of an excel sheet
 
 
 # Functions
-def check_if_excel_exists(excel_file_name):
+def register_named_styles(workbook):
     """
-    Checks if an Excel file exists, and returns an openpyxl Workbook object.
-
-    If the specified Excel file exists, it loads and returns the workbook. 
-    If the file does not exist, it creates a new workbook, saves it with the 
-    specified filename, and returns the new workbook.
+    Registers the named styles of the headers and the data cells in a workbook.
+    Styles already registered (for example in a loaded workbook) are kept.
 
     Args:
-        excel_file_name (str): The name or path of the Excel file to check.
+        workbook (openpyxl.Workbook): The workbook to register the styles in.
 
     Returns:
-        openpyxl.Workbook: The loaded or newly created workbook object.
+        None
     """
-    if os.path.exists(excel_file_name):
-        workbook = openpyxl.load_workbook(excel_file_name)
-    else:
-        workbook = openpyxl.Workbook()
-        workbook.save(excel_file_name)
-    return workbook
-
-
-def is_sheet_empty(excel_file):
-  """Checks if a specified sheet in an Excel file is empty.
-
-  Args:
-    excel_file: Path to the Excel file.
+    named_styles = [
+        NamedStyle(name=header_style_name, **headers_style),
+        NamedStyle(name=data_style_name, **data_style),
+    ]
+    for named_style in named_styles:
+        if named_style.name not in workbook.named_styles:
+            workbook.add_named_style(named_style)
 
-  Returns:
-    True if the sheet is empty, False otherwise.
-  """
-  workbook = openpyxl.load_workbook(excel_file)
-  sheet = workbook.active
-  # Check if the sheet has any rows
-  if sheet.max_row == 1 and sheet['A1'].value is None:
-    return True
-  else:
-    return False
 
-def style_excel_sheet(excel_file_name, header_styling=None, data_styling=None):
+def add_result_highlighting(sheet, column):
     """
-    Applies specified styling to the headers and data cells in an Excel sheet.
-    Contains some default styling options that will be used if header_styling or data_styling are not passed.
-    
+    Adds the conditional formatting rules highlighting the passed tests in green and the failed tests in red
+    to a column of the sheet. The rules cover the whole column below the header, so they are written once
+    and stay correct when the sheet is edited.
+
     Args:
-        excel_file_name (str): The name or path of the Excel file to style.
-        header_styling (dict): A dictionary of styling options for the header row.
-        data_styling (dict): A dictionary of styling options for the data rows.
-        
+        sheet (openpyxl.worksheet.worksheet.Worksheet): The sheet to add the rules to.
+        column (int): The index (starting at 1) of the overall result column.
+
     Returns:
         None
     """
-    # Defining the default styling options
-    default_options = {
-        "font": Font(name='Arial', size=14, bold=False),
-        "alignment": Alignment(horizontal='center', vertical='center'),
-        "fill": PatternFill(fill_type=None)
-    }
-    # check if there are any styling options passed to the function and combine them with default options
-    header_styling = {**default_options, **header_styling}
-    data_styling = {**default_options, **data_styling}
-    # Load the workbook and select the active sheet
-    workbook = check_if_excel_exists(excel_file_name)   
-    sheet = workbook.active
-     # Apply header styling
-    for cell in sheet[1]:
-        if 'font' in header_styling:
-            cell.font = header_styling['font']
-        if 'alignment' in header_styling:
-            cell.alignment = header_styling['alignment']
-        if 'fill' in header_styling:
-            cell.fill = header_styling['fill']
-     # Apply data styling
-    for row in sheet.iter_rows(min_row=2):
-        for cell in row:
-            if 'font' in data_styling:
-                cell.font = data_styling['font']
-            if 'alignment' in data_styling:
-                cell.alignment = data_styling['alignment']
-            if 'fill' in data_styling:
-                cell.fill = data_styling['fill']
-    
-    # Autofitting the rows and columns the adjusted width and height formulas are obtained by trial and error and not accurate
-    # Autofit columns
-    for col in sheet.columns:
-        max_length = 0
-        column = col[0].column_letter  # Get column letter
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-                    font_size = header_styling.get('font').size
-    
-            except:
-                pass
-        adjusted_width = max_length * font_size / 12 + 2
-        sheet.column_dimensions[column].width = adjusted_width
-    # Autofit rows
-    for row in sheet.rows:
-        max_height = 0
-        for cell in row:
-            try:
-                if len(str(cell.value)) > max_height:
-                    max_height = len(str(cell.value))
-            except:
-                pass
-        adjusted_height = max_height * font_size / 12 + 2
-        sheet.row_dimensions[row[0].row].height = adjusted_height
-    
-    workbook.save(excel_file_name)
-
-def write_data_excel(excel_file_name, excel_data):
-    """
-    Writes data to an Excel file.
+    column_letter = get_column_letter(column)
+    cells_range = f"{column_letter}2:{column_letter}{excel_max_rows}"
+    sheet.conditional_formatting.add(cells_range, CellIsRule(operator='equal', formula=[f'"{passed_cases}"'],
+                                                             fill=passed_fill))
+    sheet.conditional_formatting.add(cells_range, CellIsRule(operator='equal', formula=[f'"{failed_cases}"'],
+                                                             fill=failed_fill))
 
-    Args:
-        excel_file_name (str): The name or path of the Excel file to write data to.
-        excel_data (list): A list of lists, where each sublist represents a row of data to be written to the Excel file.
 
-    Returns:
-        None
+# Classes
+class ExcelWorkbookSession:
     """
-    # Load the workbook and select the active sheet
-    workbook = check_if_excel_exists(excel_file_name)
-    sheet = workbook.active
-    if is_sheet_empty(excel_file_name):
-        next_row = sheet.max_row
-    else:
-        next_row = sheet.max_row + 1
-    for row_data in excel_data:
-        for col, data in enumerate(row_data, start=1):
-            sheet.cell(row=next_row, column=col, value=data)
-        next_row += 1
-    workbook.save(excel_file_name)
-    
-    
-
-def format_cells_with_values(excel_file_name, search_value, font=None, fill=None, alignment=None):
+    Keeps the output Excel workbook in memory for a whole run.
+
+    The workbook is loaded (or created) once, the rows of all the HTML files are appended
+    in memory with their named style (the results are highlighted by conditional formatting),
+    and the file is only written when the session is saved: at the end of the run (close) or
+    at checkpoints every checkpoint_rows rows. The interval is multiplied by checkpoint_growth after
+    every checkpoint, a growing interval keeps the total cost of the saves linear in the number of rows
+    (every save writes the whole workbook). The column widths and row heights are tracked
+    while the rows are appended and applied when the file is saved, without rescanning the sheet.
+    It can be used as a context manager.
+
+    The rows written between start_source and end_source are recorded in the sources index of the
+    workbook (hidden Sources sheet). The rows of a file already in the index replace its previous
+    rows in place, the rows after them are shifted if the number of rows of the file changed.
+    The sources index is written on every save, even when it is empty. The rows found after the last
+    indexed file (or after the header row if no file is indexed yet) when the workbook is loaded belong
+    to a file whose writing was interrupted and are deleted. The completed files and the saves are recorded in the
+    journal of the run, if any.
     """
-    Formats cells in an Excel file that contain a specific search value with given styling options.
 
-    This function loads an Excel file and iterates through all cells in the active sheet. 
-    If a cell contains the specified search value, it applies the provided formatting options 
-    (font, fill, and alignment) to that cell.
+    def __init__(self, excel_file_name, checkpoint_rows=None, journal=None, checkpoint_growth=1):
+        self.excel_file_name = excel_file_name    # The name or path of the Excel file
+        self.checkpoint_rows = checkpoint_rows    # Rows appended between two saves (None: only saved on close)
+        self.checkpoint_growth = checkpoint_growth  # Factor of checkpoint_rows after every checkpoint (1: fixed)
+        self.unsaved_rows = 0                     # Rows appended since the last save
+        self.autofit_tracker = AutofitTracker()   # Column widths and row heights of the appended rows
+        self.journal = journal                    # Journal of the run (RunJournal), None if not journaled
+        self.existing_file = os.path.exists(excel_file_name)  # The rows are appended to an existing file
+        if self.existing_file:
+            self.workbook = openpyxl.load_workbook(excel_file_name)
+        else:
+            self.workbook = openpyxl.Workbook()
+        register_named_styles(self.workbook)
+        self.sheet = self.workbook.active
+        # The data is written after the last row, or in the first row of an empty sheet
+        if self.sheet.max_row == 1 and self.sheet['A1'].value is None:
+            self.next_row = 1
+        else:
+            self.next_row = self.sheet.max_row + 1
+        self.sources = load_sources_index(self.workbook)  # Sources index: file name -> SourceEntry
+        # The header row is already written in a workbook with a sources index (saved by a session) and rows
+        self.header_written = sources_sheet_name in self.workbook.sheetnames and self.next_row > 1
+        if self.header_written:
+            # The indexed rows end after the last indexed file, or after the header row if no file is indexed yet
+            indexed_rows_end = max((entry.first_row + entry.row_count for entry in self.sources.values()), default=2)
+            if self.next_row > indexed_rows_end:
+                # Discarding the rows of the file being written when the previous run was interrupted
+                self.shift_sheet_rows(indexed_rows_end, indexed_rows_end - self.next_row)
+                self.next_row = indexed_rows_end
+        self.current_source = None  # Name and signature of the file being written (start_source)
+        self.write_row = self.next_row  # Row where the next appended row is written
+        self.replaced_rows = 0  # Rows of the previous version of the current file not yet overwritten
+        self.source_first_row = self.write_row  # First row of the current file
 
-    Args:
-        excel_file_name (str): The name or path of the Excel file to be formatted.
-        search_value (any): The value to search for in the cells. Cells containing this value will be formatted.
-        font (openpyxl.styles.Font, optional): The font to apply to the cells containing the search value. Default is None.
-        fill (openpyxl.styles.PatternFill, optional): The fill pattern to apply to the cells containing the search value. Default is None.
-        alignment (openpyxl.styles.Alignment, optional): The alignment to apply to the cells containing the search value. Default is None.
+    def append_header(self, headers):
+        """
+        Appends the header row to the sheet in memory and highlights the overall result column.
 
-    Returns:
-        None
+        Args:
+            headers (list): The header names.
+
+        Returns:
+            None
+        """
+        if self.header_written:
+            # Appending to a workbook with a sources index, the header row is already written
+            return
+        for col, header in enumerate(headers, start=1):
+            self.sheet.cell(row=self.next_row, column=col, value=header).style = header_style_name
+        if overall_result_header in headers:
+            add_result_highlighting(self.sheet, headers.index(overall_result_header) + 1)
+        self.autofit_tracker.track_row(self.next_row, headers, headers_style['font'])
+        self.next_row += 1
+        self.write_row = self.next_row
+        self.unsaved_rows += 1
+        self.header_written = True
+
+    def start_source(self, file_path):
+        """
+        Starts writing the rows of an HTML file. If the file is in the sources index, its rows
+        are written over the rows of its previous version.
+
+        Args:
+            file_path (str): The path of the HTML file.
+
+        Returns:
+            None
+        """
+        file = os.path.basename(file_path)
+        self.current_source = (file, *file_signature(file_path))
+        previous_entry = self.sources.get(file)
+        if previous_entry is None:
+            self.write_row = self.next_row
+            self.replaced_rows = 0
+        else:
+            self.write_row = previous_entry.first_row
+            self.replaced_rows = previous_entry.row_count
+        self.source_first_row = self.write_row
+
+    def shift_sheet_rows(self, from_row, offset):
+        """
+        Inserts (positive offset) or deletes (negative offset) rows of the sheet at a row. The row heights
+        of the sheet and the tracked row heights are moved with the rows.
+
+        Args:
+            from_row (int): The first inserted or deleted row.
+            offset (int): The number of inserted or deleted rows.
+
+        Returns:
+            None
+        """
+        if offset > 0:
+            self.sheet.insert_rows(from_row, offset)
+        else:
+            self.sheet.delete_rows(from_row, -offset)
+        shift_row_dimensions(self.sheet, from_row, offset)
+        self.autofit_tracker.shift_rows(from_row, offset)
+
+    def shift_sources(self, from_row, offset):
+        """
+        Shifts the index entries of the files starting at or after a row, when rows are inserted or deleted.
+
+        Args:
+            from_row (int): The first shifted row.
+            offset (int): The number of inserted (positive) or deleted (negative) rows.
+
+        Returns:
+            None
+        """
+        current_file = self.current_source[0]
+        for file, entry in self.sources.items():
+            if file != current_file and entry.first_row >= from_row:
+                self.sources[file] = entry._replace(first_row=entry.first_row + offset)
+
+    def end_source(self):
+        """
+        Ends the rows of the current HTML file: the remaining rows of its previous version are deleted
+        and its entry of the sources index is updated.
+
+        Returns:
+            None
+        """
+        if self.replaced_rows:
+            # The new version of the file has less rows than the previous one
+            self.shift_sheet_rows(self.write_row, -self.replaced_rows)
+            self.shift_sources(self.write_row, -self.replaced_rows)
+            self.next_row -= self.replaced_rows
+            self.replaced_rows = 0
+        file, size, mtime = self.current_source
+        self.sources[file] = SourceEntry(size, mtime, self.source_first_row, self.write_row - self.source_first_row)
+        if self.journal is not None:
+            self.journal.record_file(file, self.source_first_row, self.write_row - self.source_first_row)
+        self.current_source = None
+        self.write_row = self.next_row
+
+    def append_rows(self, excel_data):
+        """
+        Appends rows to the sheet in memory with the data style, saving the file if a checkpoint is reached.
+
+        Args:
+            excel_data (iterable): Rows of data, each row being a list of cell values.
+
+        Returns:
+            None
+        """
+        sheet = self.sheet
+        data_font = data_style['font']
+        excel_data = list(excel_data)
+        missing_rows = len(excel_data) - self.replaced_rows
+        if missing_rows > 0:
+            if self.write_row + self.replaced_rows < self.next_row:
+                # The new version of a file has more rows than the previous one, making room before the next file
+                self.shift_sheet_rows(self.write_row + self.replaced_rows, missing_rows)
+                self.shift_sources(self.write_row + self.replaced_rows, missing_rows)
+            self.next_row += missing_rows
+            self.replaced_rows += missing_rows
+        for row_data in excel_data:
+            if self.replaced_rows > 0:
+                # The height of the replaced row is dropped, the tracked height of the new row is applied on save
+                sheet.row_dimensions.pop(self.write_row, None)
+            for col, data in enumerate(row_data, start=1):
+                sheet.cell(row=self.write_row, column=col, value=data).style = data_style_name
+            self.autofit_tracker.track_row(self.write_row, row_data, data_font)
+            self.write_row += 1
+            self.replaced_rows -= 1
+            self.unsaved_rows += 1
+        if self.checkpoint_rows and self.unsaved_rows >= self.checkpoint_rows:
+            self.save()
+            self.checkpoint_rows = int(self.checkpoint_rows * self.checkpoint_growth)
+
+    def save(self):
+        """
+        Autofits the sheet with the tracked sizes and writes the workbook to the Excel file (checkpoint).
+        The workbook is written to a temporary file replacing the Excel file once complete, so a crash
+        during the save keeps the Excel file of the previous checkpoint.
+
+        Returns:
+            None
+        """
+        self.autofit_tracker.apply(self.sheet, keep_wider_columns=self.existing_file)
+        # The index is written even when it is empty, so the rows of an unfinished first file are found on load
+        write_sources_index(self.workbook, self.sources)
+        temp_file_name = self.excel_file_name + temp_file_extension
+        self.workbook.save(temp_file_name)
+        os.replace(temp_file_name, self.excel_file_name)
+        self.unsaved_rows = 0
+        if self.journal is not None:
+            # The files recorded until now are in the saved file
+            self.journal.record_checkpoint(self.next_row - 1)
+
+    def close(self):
+        """
+        Saves the workbook and releases it.
+
+        Returns:
+            None
+        """
+        if self.workbook is not None:
+            self.save()
+            self.workbook.close()
+            self.workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class WriteOnlyExcelSession:
+    """
+    Streams the output rows to the Excel file with an openpyxl write only workbook.
+
+    Every row is written to a temporary file as soon as it is appended and no cell stays in memory,
+    so the memory use doesn't grow with the number of rows and closing the session only has to
+    zip the sheet. The cells get their named style when they are written and the results are
+    highlighted by conditional formatting. As the column widths
+    have to be set before the first row, they are estimated from the headers.
     """
-    # Load the workbook and select the active sheet
-    workbook = openpyxl.load_workbook(excel_file_name)
-    sheet = workbook.active
-    
-    # Iterate over all rows and columns in the sheet
-    for row in sheet.iter_rows():
-        for cell in row:
-            # Check if the cell value matches the search value
-            if cell.value == search_value:
-                # Apply formatting if value matches
-                if font:
-                    cell.font = font
-                if fill:
-                    cell.fill = fill
-                if alignment:
-                    cell.alignment = alignment
-    
-    # Save the workbook
-    workbook.save(excel_file_name)
+
+    def __init__(self, excel_file_name):
+        self.excel_file_name = excel_file_name    # The name or path of the Excel file (always overwritten)
+        self.workbook = openpyxl.Workbook(write_only=True)
+        register_named_styles(self.workbook)
+        self.sheet = self.workbook.create_sheet()
+        self.style_cells = {}  # Named style name -> styled cells of a row, one per column, reused for every row
+
+    def styled_cells(self, values, style_name):
+        """
+        Returns the cells of a row of the write only sheet with a named style and the given values.
+
+        The cells of every named style are created once (the named style is only looked up for them)
+        and reused for every row, as the write only sheet writes the cells of a row when it is appended.
+
+        Args:
+            values (iterable): The values of the cells.
+            style_name (str): The name of the registered named style.
+
+        Returns:
+            list: The styled cells (openpyxl.cell.WriteOnlyCell), to append before the next call.
+        """
+        values = list(values)
+        cells = self.style_cells.setdefault(style_name, [])
+        while len(cells) < len(values):
+            cell = WriteOnlyCell(self.sheet)
+            cell.style = style_name
+            cells.append(cell)
+        for cell, value in zip(cells, values):
+            cell.value = value
+        return cells[:len(values)]
+
+    def append_header(self, headers):
+        """
+        Sets the column widths from the headers, highlights the overall result column and writes
+        the styled header row.
+
+        Args:
+            headers (list): The header names.
+
+        Returns:
+            None
+        """
+        header_font = headers_style['font']
+        header_widths = character_widths(header_font.name, header_font.size, bool(header_font.b))
+        for col, header in enumerate(headers, start=1):
+            width = max(text_width(str(header), header_widths, header_font.size), write_only_min_column_width) + column_padding
+            self.sheet.column_dimensions[get_column_letter(col)].width = width
+        if overall_result_header in headers:
+            add_result_highlighting(self.sheet, headers.index(overall_result_header) + 1)
+        self.sheet.append(self.styled_cells(headers, header_style_name))
+
+    def append_rows(self, excel_data):
+        """
+        Writes styled data rows to the sheet.
+
+        Args:
+            excel_data (iterable): Rows of data, each row being a list of cell values.
+
+        Returns:
+            None
+        """
+        for row_data in excel_data:
+            self.sheet.append(self.styled_cells(row_data, data_style_name))
+
+    def close(self):
+        """
+        Writes the workbook to the Excel file. A write only workbook can only be saved once.
+
+        Returns:
+            None
+        """
+        if self.workbook is not None:
+            self.workbook.save(self.excel_file_name)
+            self.workbook = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
-# Classes
 class Worker(QObject):
     # Signals to control the GUI using threading
     progress_updated = pyqtSignal(int)  # Signal to update progress
     status_update = pyqtSignal(str)     # Signal to send status updates
     task_completed = pyqtSignal()       # Signal of task completion
-    task_error = pyqtSignal()           # Signal of error
+    task_error = pyqtSignal(str)        # Signal of error, with the error message
 
-    def __init__(self, parent=None):
+    def __init__(self, context, parent=None, backend=default_backend, backend_options=None, pipeline="serial", readers=4,
+                 excel_mode="normal", sink_names=(), append=False, use_parse_cache=True, resume=False,
+                 duplicate_policy="keep"):
         super().__init__()
+        self.context = context  # The context of the run: directory, files, output paths, options and progress
         self.parent_widget = parent
+        self.backend = backend  # Name of the extraction backend used to read the HTML files (see extraction_backends.py)
+        self.backend_options = backend_options or {}  # Keyword arguments passed to the extraction backend
+        self.pipeline = pipeline  # Processing pipeline: serial (backend.extract_many) or asyncio (async_pipeline.py)
+        self.readers = readers    # Number of concurrent file readers of the asyncio pipeline (and of the summary only mode)
+        self.extraction_counts = Counter()  # Number of reports extracted by every method (ReportTable.extracted_by)
+        self.excel_mode = excel_mode  # Output mode of the excel file (see excel_modes)
+        self.sink_names = list(sink_names)  # Names of the output sinks written alongside the excel file (csv, jsonl)
+        self.sink_fan_out = None  # Fan out writing the rows to the excel file and the output sinks of the current run
+        self.append = append  # Keep the existing excel file and only process the new and changed files
+        self.use_parse_cache = use_parse_cache  # Serve the unchanged reports from the parse cache instead of parsing them
+        self.parse_cache = None  # Parse cache of the current run
+        self.resume = resume  # Resume the interrupted run of the journal instead of starting a new one
+        self.duplicate_policy = duplicate_policy  # Handling of the duplicate reports (see report_discovery.py)
+        self.duplicates = {}  # Original file path -> paths of its duplicates, found in the current run
+        self.skipped_files = []  # (path, reason) of the files rejected by the pre-flight check or failed in the current run
+
+    def write_report(self, file_path, report):
+        """
+        Writes the extracted data of an HTML file to the excel file and the output sinks (through the sink fan out),
+        and updates the status and the progress bar. A file whose extraction failed, or without any test step,
+        is skipped.
+
+        Args:
+            file_path (str): The path of the HTML file.
+            report (ReportTable): The headers, rows and overall result row of the HTML file.
+
+        Returns:
+            None
+        """
+        file = os.path.basename(file_path)
+        aliases = self.duplicates.get(file_path, ()) if self.duplicate_policy == "alias" else ()
+        if aliases:
+            # The rows are written again under the name of every duplicate, without parsing it
+            report = report._replace(rows=[list(row) for row in report.rows])
+        if report.extracted_by == failed_extraction:
+            # The malformed file is skipped (with its duplicates), the run continues with the next file
+            for skipped_path in [file_path, *aliases]:
+                self.skip_report(skipped_path, report.error)
+            return
+        # The rows are consumed as an iterator, the rows of streamed reports are parsed while they are written
+        rows = iter(report.rows)
+        overall_test_result = list(report.overall_result)
+        first_row = next(rows, None)
+        if first_row is None:
+            for skipped_path in [file_path, *aliases]:
+                self.skip_report(skipped_path, "the HTML table doesn't contain any test steps")
+            return
+        self.extraction_counts[report.extracted_by] += 1
+        # Sending signals to update status on the GUI and update the progress bar
+        self.status_update.emit(f"*************Test File: {file}*************\n")
+        self.status_update.emit(f"{str(overall_test_result)}\n")
+        # The same row batches are written to the excel file and all the other sinks,
+        # the excel sink writes the headers once and the overall result in the first row of the file
+        self.sink_fan_out.start_report(report.headers, file_path, overall_test_result[0])
+        # Write the data of the current HTML file to the outputs, at most rows_per_write rows at once
+        table_data = [list(first_row)]
+        table_data.extend(list(row) for row in islice(rows, rows_per_write - 1))
+        while table_data:
+            self.sink_fan_out.write_rows(table_data)
+            table_data = [list(row) for row in islice(rows, rows_per_write)]
+        # Flushing the rows of the file so the sinks can be followed during the run
+        self.sink_fan_out.end_report()
+        self.progress_updated.emit(self.context.advance_progress())
+        for alias_path in aliases:
+            self.write_report(alias_path, report._replace(extracted_by="duplicate"))
+
+    def skip_report(self, file_path, reason):
+        """
+        Skips an HTML file that couldn't be extracted: the file is listed as skipped with the reason
+        and the progress bar is updated.
+
+        Args:
+            file_path (str): The path of the HTML file.
+            reason (str): The reason why the file is skipped.
+
+        Returns:
+            None
+        """
+        self.skipped_files.append((file_path, reason))
+        self.status_update.emit(f"Skipped {os.path.basename(file_path)}: {reason}\n")
+        self.progress_updated.emit(self.context.advance_progress())
+
+    def run_summary(self, file_paths):
+        """
+        Writes one row per HTML file with its test ID and overall result to the summary excel file and the sinks.
+
+        The overall result is read from a small window at the end of every file, so the test table
+        is never parsed. The files are read concurrently by self.readers threads.
+
+        Args:
+            file_paths (list): The paths of the HTML files.
+
+        Returns:
+            None
+        """
+        with ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix='summary-reader') as executor:
+            overall_results = extract_in_order(executor, partial(extract_safely, read_overall_result), file_paths,
+                                               self.readers * 4)
+            for file_index, overall_test_result in enumerate(overall_results):
+                aliases = self.duplicates.get(file_paths[file_index], []) if self.duplicate_policy == "alias" else []
+                if isinstance(overall_test_result, ReportTable):
+                    # The overall result couldn't be read (failed report), the file is skipped with its duplicates
+                    for skipped_path in [file_paths[file_index], *aliases]:
+                        self.skip_report(skipped_path, overall_test_result.error)
+                    continue
+                for file_path in [file_paths[file_index], *aliases]:
+                    file = os.path.basename(file_path)
+                    # The excel sink writes one row per file in summary only mode, the other sinks one row without steps
+                    self.sink_fan_out.start_report([], file_path, overall_test_result[0])
+                    self.sink_fan_out.write_rows([[]])
+                    self.sink_fan_out.end_report()
+                    self.status_update.emit(f"*************Test File: {file}*************\n")
+                    self.status_update.emit(f"{str(overall_test_result)}\n")
+                    self.progress_updated.emit(self.context.advance_progress())
+
+    def reject_invalid_reports(self, file_paths):
+        """
+        Runs the pre-flight check on the HTML files and lists the rejected files (empty or malformed)
+        as skipped with their reason, so they don't reach the extraction backend.
+
+        Args:
+            file_paths (list): The paths of the HTML files.
+
+        Returns:
+            list: The paths of the accepted files.
+        """
+        accepted_files, self.skipped_files = preflight_reports(file_paths)
+        if self.skipped_files:
+            self.status_update.emit(f"Pre-flight check: {len(self.skipped_files)} files skipped\n")
+            for file_path, reason in self.skipped_files:
+                self.status_update.emit(f"Skipped {os.path.basename(file_path)}: {reason}\n")
+        return accepted_files
+
+    def remove_duplicate_reports(self, file_paths, written_paths=()):
+        """
+        Finds the duplicate reports (same content) and returns the files to parse: the original of every
+        group of identical files. The duplicates are skipped or written as aliases of their original.
+        With the skip policy, the files identical to a file already written by the previous run (append
+        and resume modes) are skipped too, as duplicates of the written file.
+
+        Args:
+            file_paths (list): The paths of the HTML files.
+            written_paths (list): The paths of the HTML files of the directory already written.
+
+        Returns:
+            list: The paths of the original files.
+        """
+        original_files, self.duplicates = find_duplicate_reports(file_paths)
+        if self.duplicate_policy == "skip" and written_paths:
+            written_duplicates = find_written_duplicates(original_files, written_paths)
+            for original_path, written_path in written_duplicates.items():
+                # The original and its duplicates are all duplicates of the written file
+                duplicate_paths = self.duplicates.setdefault(written_path, [])
+                duplicate_paths.extend([original_path, *self.duplicates.pop(original_path, [])])
+                duplicate_paths.sort(key=original_file_key)
+            original_files = [file_path for file_path in original_files if file_path not in written_duplicates]
+        duplicate_count = len(file_paths) - len(original_files)
+        action = "skipped" if self.duplicate_policy == "skip" else "written as aliases of their original"
+        self.status_update.emit(f"Duplicate reports: {duplicate_count} duplicates of {len(self.duplicates)} files, "
+                                f"{action}\n")
+        for original_path, duplicate_paths in self.duplicates.items():
+            for duplicate_path in duplicate_paths:
+                self.status_update.emit(f"{os.path.basename(duplicate_path)} is a duplicate of "
+                                        f"{os.path.basename(original_path)}\n")
+        return original_files
+
+    def select_changed_files(self, excel_file_name, file_paths):
+        """
+        Returns the HTML files to process in append mode: the files missing from the sources index of the
+        existing excel file, or changed since they were written. The index is read with a read only workbook.
+        An existing excel file without sources index is removed and all the files are processed.
+
+        Args:
+            excel_file_name (str): The name or path of the excel file.
+            file_paths (list): The paths of the HTML files.
+
+        Returns:
+            list: The paths of the new and changed HTML files.
+        """
+        sources = read_sources_index(excel_file_name)
+        if sources is None:
+            if os.path.exists(excel_file_name):
+                self.status_update.emit(f"{excel_file_name} has no sources index, it is created again\n")
+                os.remove(excel_file_name)
+            return file_paths
+        changed_files, unchanged_files = split_changed_files(file_paths, sources)
+        self.status_update.emit(f"Append mode: {len(changed_files)} new or changed files, "
+                                f"{unchanged_files} unchanged files skipped\n")
+        return changed_files
+
+    def select_unfinished_files(self, journal_file_name, excel_file_name, file_paths):
+        """
+        Returns the HTML files to process when resuming a run: the files that are not durably written in the
+        excel file according to the journal of the run. Without journal (or excel file), or if the sources index
+        of the excel file doesn't match the files of the last checkpoint of the journal, a new run is started.
+
+        Args:
+            journal_file_name (str): The path of the journal of the run.
+            excel_file_name (str): The name or path of the excel file.
+            file_paths (list): The paths of the HTML files.
+
+        Returns:
+            list: The paths of the HTML files to process.
+
+        Raises:
+            ValueError: If the journal is the journal of the run of another directory.
+        """
+        journal_state = read_journal(journal_file_name)
+        if journal_state is not None:
+            journal_directory = journal_state.run_info.get('directory')
+            run_directory = os.path.abspath(self.context.directory)
+            if journal_directory is None or os.path.normcase(journal_directory) != os.path.normcase(run_directory):
+                raise ValueError(f"{journal_file_name} is the journal of the run of {journal_directory}, "
+                                 f"it can't be resumed for {run_directory}")
+        if journal_state is not None and os.path.exists(excel_file_name):
+            # The saved excel file must hold the files of the journal checkpoint where its index says
+            sources = read_sources_index(excel_file_name)
+            if sources is None or any(sources.get(file) is None or sources[file][2:] != tuple(block)
+                                      for file, block in journal_state.completed_files.items()):
+                self.status_update.emit(f"{excel_file_name} doesn't match the journal of the run\n")
+                journal_state = None
+        if journal_state is None or not os.path.exists(excel_file_name):
+            self.status_update.emit("No interrupted run to resume, starting a new run\n")
+            for previous_file in (excel_file_name, journal_file_name):
+                if os.path.exists(previous_file):
+                    os.remove(previous_file)
+            return file_paths
+        completed_files = journal_state.completed_files
+        unfinished_files = [file_path for file_path in file_paths if os.path.basename(file_path) not in completed_files]
+        status = "The last run completed" if journal_state.finished else "Resuming the interrupted run"
+        self.status_update.emit(f"{status}: {len(completed_files)} files written ({journal_state.durable_rows} rows), "
+                                f"{len(unfinished_files)} files remaining\n")
+        return unfinished_files
+
+    def report_extraction_counts(self):
+        """
+        Sends a status update with the number of files read by the fast path scanner, by the full parser
+        and from the parse cache.
+
+        Returns:
+            None
+        """
+        status = (f"Fast path: {self.extraction_counts['fast_path']} files, "
+                  f"full parser fallback: {self.extraction_counts['html_parser']} files")
+        if self.extraction_counts['streamed']:
+            status += f", streamed: {self.extraction_counts['streamed']} files"
+        if self.extraction_counts['cache']:
+            status += f", parse cache: {self.extraction_counts['cache']} files"
+        self.status_update.emit(status + "\n")
+
+    def run_async_pipeline(self, backend, file_paths):
+        """
+        Processes the files with the asyncio pipeline (concurrent reads, parsing in an executor, single writer).
+
+        Args:
+            backend (ExtractionBackend): The extraction backend, it must be able to parse files from memory.
+            file_paths (list): The paths of the HTML files.
+
+        Returns:
+            None
+        """
+        parse_bytes = backend.get_bytes_parser()
+        if parse_bytes is None:
+            raise ValueError(f"The {self.backend} backend can't be used with the asyncio pipeline")
+        workers = self.backend_options.get("workers", 1)
+        # Only the cache misses go through the pipeline, the cached reports are written between them in file order
+        if self.parse_cache is not None:
+            cached_reports = self.parse_cache.lookup_many(file_paths)
+        else:
+            cached_reports = [None] * len(file_paths)
+        missed_files = [file_path for file_path, payload in zip(file_paths, cached_reports) if payload is None]
+        file_indexes = {file_path: file_index for file_index, file_path in enumerate(file_paths)}
+        next_index = 0  # Index of the next file to write
+
+        def write_cached_reports(stop_index):
+            nonlocal next_index
+            while next_index < stop_index:
+                if cached_reports[next_index] is not None:
+                    self.write_report(file_paths[next_index], decode_report(cached_reports[next_index]))
+                next_index += 1
+
+        def write_parsed_report(file_path, report):
+            nonlocal next_index
+            write_cached_reports(file_indexes[file_path])
+            if self.parse_cache is not None:
+                report = self.parse_cache.put(file_path, report)
+            self.write_report(file_path, report)
+            next_index += 1
+        # Parsing in worker processes when several workers are selected, otherwise in a single thread
+        parse_executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+        def report_queue_depths(written_files, depths):
+            if written_files % 100 == 0:
+                self.status_update.emit(f"Pipeline queue depths after {written_files} files: {depths}\n")
+
+        try:
+            stats = run_pipeline(missed_files, parse_bytes, write_parsed_report, readers=self.readers,
+                                 parse_executor=parse_executor, on_progress=report_queue_depths)
+        finally:
+            if parse_executor is not None:
+                parse_executor.shutdown()
+        write_cached_reports(len(file_paths))
+        self.status_update.emit(f"Pipeline maximum queue depths: {stats.max_depths}\n")
 
     def run(self):
         try:
-            # Remove any previous excel files to start with a new one
-            if os.path.exists(test_results_excel_file):
-                os.remove(test_results_excel_file)
-            # Variable to check if this is the first iteration.
-            first_iteration = True
+            context = self.context
+            output_excel_file = context.output_excel_file
+            journal_file = os.path.splitext(output_excel_file)[0] + journal_extension
+            if (self.append or self.resume) and self.excel_mode != "normal":
+                raise ValueError("The append and resume modes can only update the excel file in the normal excel mode")
+            if not (self.append or self.resume) and os.path.exists(output_excel_file):
+                # Remove any previous excel files to start with a new one
+                os.remove(output_excel_file)
+            if not self.resume and os.path.exists(journal_file):
+                # The journal of the previous run is replaced by the journal of this run
+                os.remove(journal_file)
+            self.extraction_counts.clear()
             # Check if there are HTML files in the directory.
-            if not files_list:
-                self.task_error.emit()
+            if not context.file_names:
+                self.task_error.emit("The directory doesn't contain HTML files")
                 return
 
             self.status_update.emit("************************* Tests Summary *************************\n\n")
-            global progress_bar_step
-            global progress_bar_counter
-            progress_bar_counter = 0
-            for file in files_list:
-                if file.endswith('html'):
-                    full_file_name = 'file://' + dir_name + '/' + file
-                    driver.get(full_file_name)
-                    table = driver.find_element(By.TAG_NAME, 'table')
-                    if first_iteration:
-                        headers = table.find_elements(By.TAG_NAME, 'th')
-                        headers_list = [header.text for header in headers]
-                        print(headers_list)
-                        # Adding an extra column for the overall result
-                        headers_list.append('Overall Result')
-                        # Headers styling dict
-                        # Calling the function to write the headers name to the excel file.
-                        write_data_excel(test_results_excel_file, [headers_list])
-                        # Setting the first iteration flag to false to write the headers only once in the file.
-                        first_iteration = False
-                    
-                    # Getting tests data from the HTML file
-                    rows = table.find_elements(By.TAG_NAME, 'tr')
-                    table_data = []
-                    for row in rows:
-                        cells = row.find_elements(By.TAG_NAME, 'td')
-                        cell_data = [cell.text for cell in cells]
-                        if cell_data:
-                            table_data.append(cell_data)
-                    # Removing the last row in the HTML (contains the test result summary[pass or fail])
-                    overall_test_result = table_data.pop()
-                    # Appending the test result to the first row in the new column (overall results)
-                    table_data[0].append(overall_test_result[0])
-                    # Sending signals to update status on the GUI and update the progress bar
-                    self.status_update.emit(f"*************Test File: {file}*************\n")
-                    self.status_update.emit(f"{str(overall_test_result)}\n")
-                    print(table_data) # print for testing
-                    # Write the data of the current HTML file to the excel file
-                    write_data_excel(test_results_excel_file, table_data)
-                    progress_bar_counter += progress_bar_step
-                    self.progress_updated.emit(int(progress_bar_counter))
-
-            ####################################### Styling The Excel Sheet #######################################
-            # Headers Styling dict
-            headers_style = {
-                    "font": Font(name='Arial', size=12, bold=True),
-                    "alignment": Alignment(horizontal='center', vertical='center'),
-                    "fill": PatternFill(start_color='ADD8E6', end_color='ADD8E6', fill_type='solid')
-                }
-            # Data Styling dict
-            data_style = {
-                "font": Font(name='Arial', size=12, bold=False),
-                "alignment": Alignment(horizontal='center', vertical='center')
-            }
-            # Applying style to the Excel sheet
-            style_excel_sheet(test_results_excel_file, headers_style, data_style)
-            # Applying red highlight to failed tests and green highlight to passed tests
-            passed_fill = PatternFill(start_color='00FF00', end_color='00FF00', fill_type='solid')
-            failed_fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-            passed_cases = "Test Result : PASSED"
-            failed_cases = "Test Result : FAILED"
-            format_cells_with_values(test_results_excel_file, passed_cases, fill=passed_fill)
-            format_cells_with_values(test_results_excel_file, failed_cases, fill=failed_fill)
+            listed_paths = file_paths = context.file_paths()
+            if self.resume:
+                # Only the files not yet written by the interrupted run are processed
+                file_paths = self.select_unfinished_files(journal_file, output_excel_file, file_paths)
+            elif self.append:
+                # Only the new and changed files are processed, the existing excel file is updated
+                file_paths = self.select_changed_files(output_excel_file, file_paths)
+            # The files of the directory left out by the append and resume modes were written by the previous run
+            selected_paths = set(file_paths)
+            written_paths = [file_path for file_path in listed_paths if file_path not in selected_paths]
+            # The empty and malformed files are skipped before they reach the extraction backend
+            file_paths = self.reject_invalid_reports(file_paths)
+            if not file_paths:
+                if self.append or self.resume:
+                    # Nothing new to write, the existing excel file is complete
+                    self.progress_updated.emit(100)
+                    self.task_completed.emit()
+                else:
+                    self.task_error.emit("All the HTML files were skipped by the pre-flight check (see the log)")
+                return
+            self.duplicates = {}
+            if self.duplicate_policy != "keep":
+                # Only the original of every group of identical reports is parsed
+                file_paths = self.remove_duplicate_reports(file_paths, written_paths)
+            written_files = len(file_paths)
+            if self.duplicate_policy == "alias":
+                written_files += sum(len(duplicate_paths) for duplicate_paths in self.duplicates.values())
+            context.start_progress(written_files)
+            if self.excel_mode == "write_only":
+                # The rows are streamed to the excel file as they are written
+                excel_session = WriteOnlyExcelSession(output_excel_file)
+            elif self.excel_mode == "stream":
+                # The rows XML is streamed directly into the xlsx zip file, without openpyxl cells
+                excel_session = StreamingXlsxWriter(output_excel_file, headers_style, data_style, overall_result_header,
+                                                    {passed_cases: passed_fill, failed_cases: failed_fill},
+                                                    write_only_min_column_width)
+            else:
+                # The output workbook is kept in memory during the run and saved once when the session is closed
+                # (also when an error occurs, keeping the rows written before the error). The completed files
+                # and the saves are recorded in the journal, so an interrupted run can be resumed.
+                resumed_run = os.path.exists(journal_file)
+                journal = RunJournal(journal_file)
+                if resumed_run:
+                    journal.record_event('resume', remaining_files=len(file_paths))
+                else:
+                    journal.record_event('start', directory=os.path.abspath(context.directory),
+                                         output=output_excel_file)
+                excel_session = ExcelWorkbookSession(output_excel_file, context.checkpoint_rows, journal,
+                                                     context.checkpoint_growth)
+            with ExitStack() as outputs:
+                if self.excel_mode == "normal":
+                    # Closed last, after the final save of the excel file
+                    outputs.enter_context(journal)
+                sinks = [ExcelSink(outputs.enter_context(excel_session), overall_result_header, context.summary_only)]
+                # The output sinks are written alongside the excel file, with the same base name
+                sinks.extend(outputs.enter_context(create_sink(sink_name, output_excel_file))
+                             for sink_name in self.sink_names)
+                # Every sink writes from its own buffer in its own thread (closed first, before the sessions)
+                self.sink_fan_out = outputs.enter_context(SinkFanOut(sinks))
+                if context.summary_only:
+                    # The summary only mode reads the overall results without any extraction backend
+                    self.run_summary(file_paths)
+                else:
+                    # Creating the extraction backend used to read the test table of each HTML file
+                    with get_backend(self.backend, **self.backend_options) as backend:
+                        # The backend (parser or browser) is owned by the run
+                        context.backend = backend
+                        if self.use_parse_cache:
+                            # The unchanged reports are read from the parse cache, only the misses are parsed.
+                            # The reports are cached per backend and options, other options never get them.
+                            self.parse_cache = outputs.enter_context(
+                                ParseCache(context.parse_cache_file, backend.cache_key(), context.parse_cache_max_size))
+                        if self.pipeline == "asyncio":
+                            self.run_async_pipeline(backend, file_paths)
+                        else:
+                            # The reports are returned in the order of the files, even when they are extracted in parallel
+                            reports = (backend.extract_many(file_paths) if self.parse_cache is None
+                                       else self.parse_cache.extract_many(backend.extract_many, file_paths))
+                            for file_index, report in enumerate(reports):
+                                self.write_report(file_paths[file_index], report)
+                    context.backend = None
+                    if self.backend == "html_parser" and self.backend_options.get("fast_path", True):
+                        self.report_extraction_counts()
+                    if self.parse_cache is not None:
+                        self.status_update.emit(f"Parse cache: {self.parse_cache.hits} hits, "
+                                                f"{self.parse_cache.misses} misses\n")
+            if self.skipped_files:
+                self.status_update.emit(f"Skipped files: {len(self.skipped_files)}\n")
+            self.status_update.emit(f"Output buffers maximum depths (rows): {self.sink_fan_out.max_depths()}\n")
+            self.sink_fan_out = None
+            self.parse_cache = None
+            if self.excel_mode == "normal":
+                with RunJournal(journal_file) as journal:
+                    journal.record_event('finished')
             # Sending a signal that the task is completed.
             self.task_completed.emit()
 
         except Exception as e:
-            print(e)
-            self.task_error.emit()
+            self.status_update.emit(f"Error: {e}\n")
+            self.task_error.emit(str(e))
 
 
 
@@ -353,79 +941,262 @@ class BackEndClass(QtWidgets.QWidget, Ui_MainWindow):
     progress_updated = pyqtSignal(int)  # Signal to update progress
     task_completed = pyqtSignal()       # Signal to notify task completion
     status_update = pyqtSignal(str)     # Signal to receive status updates
-    task_error = pyqtSignal()           # Signal when error occurs
+    task_error = pyqtSignal(str)        # Signal when error occurs, with the error message
 
     def __init__(self):
         QtWidgets.QWidget.__init__(self)
         self.setupUi(MainWindow)
         self.browse_btn.clicked.connect(self.browse_function)
-        self.start_btn.clicked.connect(self.start_threading)
+        self.start_btn.clicked.connect(lambda: self.start_threading())
+        self.resume_btn.clicked.connect(lambda: self.start_threading(resume=True))
         self.clear_btn.clicked.connect(self.clear_logs_function)
+        # Only the backends whose dependencies are installed can be selected
+        self.backend_comboBox.addItems(available_backends())
+        self.directory = None   # The selected directory, used by the next started run
+        self.file_names = []    # The HTML files of the selected directory
+        self.runs = []          # (context, worker, thread) of the runs in progress
 
     def browse_function(self):
         self.browse_label.clear()
         try:
-            global dir_name
-            dir_name = QFileDialog.getExistingDirectory()
-            global files_list
-            files_list = os.listdir(dir_name)
-            self.browse_label.setText(dir_name)
-            files_list = [file for file in files_list if file.endswith('html')]
-            if not files_list:
+            # Selecting another directory doesn't change the runs in progress, they own their context
+            directory = QFileDialog.getExistingDirectory()
+            file_names = [file for file in os.listdir(directory) if file.endswith('html')]
+            self.directory = directory
+            self.file_names = file_names
+            self.browse_label.setText(directory)
+            if not file_names:
                 QMessageBox.about(self, "Message", "Directory Doesn't Contain HTML files!")
                 self.num_files_label.setText("No HTML files in this folder")
-            global number_of_files
-            number_of_files = len(files_list)
-            global progress_bar_step
-            progress_bar_step = 100/number_of_files
-            self.num_files_label.setText(f"Number of HTML files in selected folder is {number_of_files}")
+                return
+            self.num_files_label.setText(f"Number of HTML files in selected folder is {len(file_names)}")
         except Exception as e:
             print(e)
             QMessageBox.about(self, "Message", "Please Select a valid Directory with HTML files.")
 
-    def start_threading(self):
+    def start_threading(self, resume=False):
+        if self.directory is None:
+            QMessageBox.about(self, "Message", "No directory Selected! \n Please Select a Directory with HTML files.")
+            return
+        if any(os.path.samefile(context.directory, self.directory) for context, _, _ in self.runs):
+            QMessageBox.about(self, "Message", "This directory is already being processed.")
+            return
+        # The outputs of the run are written to its HTML directory, so they never collide with the other runs
+        context = RunContext(self.directory, self.file_names,
+                             summary_only=self.summary_checkBox.isChecked(), checkpoint_rows=default_checkpoint_rows,
+                             checkpoint_growth=default_checkpoint_growth)
         # Create a worker instance and connect signals
-        self.worker = Worker(parent=self)
-        self.worker.progress_updated.connect(self.update_progress)
-        self.worker.status_update.connect(self.update_status)
-        self.worker.task_completed.connect(self.processing_complete)
-        self.worker.task_error.connect(self.processing_error)
-
-        # Create and start the thread
-        self.thread = QThread()
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
-        self.thread.start()
+        backend = self.backend_comboBox.currentText()
+        backend_options = {"workers": self.workers_spinBox.value()}
+        if backend == "html_parser":
+            # Streaming the very large reports instead of loading them at once
+            backend_options["stream_threshold"] = default_stream_threshold
+        sink_check_boxes = (("csv", self.csv_checkBox), ("jsonl", self.jsonl_checkBox), ("sqlite", self.sqlite_checkBox))
+        sink_names = [sink_name for sink_name, check_box in sink_check_boxes if check_box.isChecked()]
+        worker = Worker(context, parent=self, backend=backend, backend_options=backend_options, sink_names=sink_names,
+                        append=self.append_checkBox.isChecked(), use_parse_cache=self.cache_checkBox.isChecked(),
+                        resume=resume, duplicate_policy="skip" if self.duplicates_checkBox.isChecked() else "keep")
+        # Create the thread of the run
+        thread = QThread()
+        run = (context, worker, thread)
+        worker.progress_updated.connect(self.update_progress)
+        worker.status_update.connect(lambda message: self.update_status(message, context))
+        worker.task_completed.connect(lambda: self.processing_complete(run))
+        worker.task_error.connect(lambda message: self.processing_error(run, message))
+        self.runs.append(run)
+
+        # Start the thread
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        thread.start()
 
     def update_progress(self, value):
-        # Disable the button to prevent multiple runs
-        self.start_btn.setEnabled(False)
-        self.progressBar.setValue(value)
-
-    def update_status(self, message):
-        self.status_textEdit.append(message)  
-
-    def processing_complete(self):
-        self.status_textEdit.append("Excel File generated successfully !")
-        # Re-enable the button after the processing is done
-        self.start_btn.setEnabled(True)
-        self.thread.quit()
-
-    def processing_error(self):
-        self.thread.quit()
-        if number_of_files == 0:
+        # The progress bar shows the progress of the slowest run in progress
+        self.progressBar.setValue(min((int(context.progress_counter) for context, _, _ in self.runs), default=value))
+
+    def update_status(self, message, context=None):
+        if context is not None and len(self.runs) > 1:
+            # Several runs write to the log, every message is prefixed with its directory
+            message = f"[{os.path.basename(context.directory)}] {message}"
+        self.status_textEdit.append(message)
+
+    def finish_run(self, run):
+        """
+        Stops the thread of a finished run and forgets the run.
+
+        Args:
+            run (tuple): The (context, worker, thread) of the run.
+
+        Returns:
+            None
+        """
+        context, worker, thread = run
+        thread.quit()
+        thread.wait()
+        if run in self.runs:
+            self.runs.remove(run)
+
+    def processing_complete(self, run):
+        context = run[0]
+        self.update_status(f"Excel File generated successfully ! ({context.output_excel_file})", context)
+        self.finish_run(run)
+
+    def processing_error(self, run, message):
+        context = run[0]
+        self.finish_run(run)
+        if context.number_of_files == 0:
             QMessageBox.about(self, "Message", "No directory Selected! \n Please Select a Directory with HTML files.")
         else:
-            QMessageBox.about(self, "Message", "Empty HTML FILE")
+            # The error of the run, its details are in the status log
+            QMessageBox.about(self, "Message", f"Processing of {context.directory} failed: \n {message}")
 
 
     def clear_logs_function(self):
         self.status_textEdit.clear()
-        
+
+
+def parse_command_line(argv):
+    """
+    Parses the command line arguments of the tool.
+
+    Args:
+        argv (list): The command line arguments without the program name.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Auto-Test Summarizer: summarizes HTML test results into an Excel file.")
+    parser.add_argument("-d", "--directory", action="append",
+                        help="Directory of the HTML files to process without opening the GUI. Can be repeated to "
+                             "process several directories at the same time. The outputs of a directory are "
+                             "written to the directory itself.")
+    parser.add_argument("-b", "--backend", choices=list(extraction_backends), default=default_backend,
+                        help="Extraction backend used to read the HTML files (default: %(default)s).")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Number of files processed in parallel: worker processes for the parser backends, "
+                             "headless Chrome instances for the selenium backend (default: %(default)s).")
+    parser.add_argument("--stream-threshold", type=float, default=default_stream_threshold / (1024 * 1024),
+                        help="Size in MB from which the html_parser backend streams a report from a memory mapped "
+                             "file instead of loading it at once, 0 to disable (default: %(default)s).")
+    parser.add_argument("--no-fast-path", action="store_true",
+                        help="Always use the full parser of the html_parser backend, without the fast path "
+                             "scanner for the known ATS report layout.")
+    parser.add_argument("-p", "--pipeline", choices=["serial", "asyncio"], default="serial",
+                        help="Processing pipeline: serial, or asyncio overlapping the file reads, the parsing and "
+                             "the excel writing (parser backends only) (default: %(default)s).")
+    parser.add_argument("--readers", type=int, default=4,
+                        help="Number of concurrent file readers of the asyncio pipeline (default: %(default)s).")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="Only read the overall result of every file from the end of the file and write one "
+                             f"row per file to {test_summary_excel_file}, without parsing the test tables.")
+    parser.add_argument("--checkpoint-rows", type=int, default=0,
+                        help="Save the excel file every N written rows during the run, 0 to only save it at the "
+                             "end of the run (normal excel mode only) (default: %(default)s).")
+    parser.add_argument("--excel-mode", choices=list(excel_modes), default="normal",
+                        help="Output mode of the excel file: normal (in-memory workbook, autofitted columns and rows) "
+                             "write_only (rows styled and streamed to disk with constant memory) or stream "
+                             "(rows XML written directly into the xlsx file, fastest for huge runs) "
+                             "(default: %(default)s).")
+    parser.add_argument("--output", action="append", choices=list(output_sinks), default=[], dest="sinks",
+                        help="Also write the rows to a CSV or JSON Lines file next to the excel file, with the "
+                             "overall result, source file and test ID in every row, or add the run to the SQLite "
+                             "result store (can be repeated).")
+    parser.add_argument("--append", action="store_true",
+                        help="Keep the existing excel file and only process the HTML files that are new or changed "
+                             "since they were written, replacing the rows of the changed files (normal excel mode "
+                             "only).")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Parse every report instead of reading the unchanged reports from the parse cache "
+                             f"({parse_cache_file}).")
+    parser.add_argument("--cache-size", type=float, default=default_parse_cache_max_size / (1024 * 1024),
+                        help="Maximum size in MB of the parse cache, the least recently used reports are evicted "
+                             "(default: %(default)s).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume the interrupted run of the directory from its last saved checkpoint, using "
+                             "the journal written next to the excel file (normal excel mode only).")
+    parser.add_argument("--duplicates", choices=list(duplicate_policies), default="keep",
+                        help="Handling of the reports with the same content: keep (no detection), skip (only the "
+                             "first file is parsed and written, no double counting) or alias (only the first file "
+                             "is parsed, its rows are also written under the name of the duplicates) "
+                             "(default: %(default)s).")
+    parser.add_argument("--selenium-mode", choices=["script", "elements"], default="script",
+                        help="Extraction mode of the selenium backend: one execute_script call per file (script) "
+                             "or one WebDriver call per cell (elements) (default: %(default)s).")
+    return parser.parse_args(argv)
+
+
+def run_from_command_line(args):
+    """
+    Processes one or several directories of HTML files without opening the GUI, printing the status updates
+    to the console. Several directories are processed at the same time, each run in its own thread with its
+    own context. The outputs of every run are written to its HTML directory.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        int: The exit code of the program (0 on success, 1 if any run failed).
+    """
+    concurrent_runs = len(args.directory) > 1
+    backend_options = {"workers": args.workers}
+    if args.backend == "selenium":
+        backend_options["mode"] = args.selenium_mode
+    if args.backend == "html_parser":
+        backend_options["fast_path"] = not args.no_fast_path
+        if args.stream_threshold > 0:
+            backend_options["stream_threshold"] = int(args.stream_threshold * 1024 * 1024)
+    runs = []  # (context, worker, errors) of every directory
+    for directory in args.directory:
+        context = RunContext(directory, summary_only=args.summary_only, checkpoint_rows=args.checkpoint_rows or None,
+                             parse_cache_max_size=int(args.cache_size * 1024 * 1024))
+        worker = Worker(context, backend=args.backend, backend_options=backend_options, pipeline=args.pipeline,
+                        readers=args.readers, excel_mode=args.excel_mode, sink_names=args.sinks, append=args.append,
+                        use_parse_cache=not args.no_cache, resume=args.resume, duplicate_policy=args.duplicates)
+        prefix = f"[{directory}] " if concurrent_runs else ""
+        errors = []
+        # Direct connections: the signals are emitted from the threads of the runs, without any event loop
+        worker.status_update.connect(lambda message, prefix=prefix: print(prefix + message.rstrip('\n')),
+                                     Qt.DirectConnection)
+        worker.task_error.connect(lambda message, errors=errors: errors.append(message), Qt.DirectConnection)
+        runs.append((context, worker, errors))
+    if concurrent_runs:
+        threads = [threading.Thread(target=worker.run, name=f"run-{run_index}")
+                   for run_index, (_, worker, _) in enumerate(runs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        runs[0][1].run()
+    exit_code = 0
+    for context, worker, errors in runs:
+        prefix = f"[{context.directory}] " if concurrent_runs else ""
+        if errors:
+            print(prefix + (f"Processing failed: {errors[0]}" if context.number_of_files
+                            else "Directory Doesn't Contain HTML files!"))
+            exit_code = 1
+        else:
+            print(f"{prefix}Excel File generated successfully ! ({context.output_excel_file})")
+    return exit_code
+
 
 if __name__ == "__main__":
+    args = parse_command_line(sys.argv[1:])
+    if args.directory:
+        sys.exit(run_from_command_line(args))
     app = QtWidgets.QApplication(sys.argv)
     MainWindow = QtWidgets.QMainWindow()
     ui = BackEndClass()
+    ui.backend_comboBox.setCurrentText(args.backend)
+    ui.workers_spinBox.setValue(args.workers)
+    ui.summary_checkBox.setChecked(args.summary_only)
+    ui.csv_checkBox.setChecked("csv" in args.sinks)
+    ui.jsonl_checkBox.setChecked("jsonl" in args.sinks)
+    ui.sqlite_checkBox.setChecked("sqlite" in args.sinks)
+    ui.append_checkBox.setChecked(args.append)
+    ui.cache_checkBox.setChecked(not args.no_cache)
+    ui.duplicates_checkBox.setChecked(args.duplicates == "skip")
     MainWindow.show()
+    # Printing the startup time once the event loop processes the first events (the window is shown)
+    QTimer.singleShot(0, lambda: print(f"Startup time: {time.perf_counter() - startup_start_time:.2f} s"))
     sys.exit(app.exec_())
@@ -0,0 +1,209 @@
+"""
+**********************************************************************************
+File: excel_autofit.py
+
+Description:
+This module estimates the displayed width of the text of Excel cells and tracks
+the column widths and row heights of a sheet while its rows are written, so the
+sheet can be autofitted once when it is saved without reading all its cells again.
+
+The widths are computed from the character widths of the cell font (Arial /
+Helvetica metrics, in 1/1000 em) converted to Excel column width units (the width
+of a digit of the default Calibri 11 font). The width table of every font and size
+is computed once and cached.
+
+Classes:
+- AutofitTracker: Tracks the column widths and row heights of the rows written to a sheet.
+
+Functions:
+- character_widths: Returns the cached character width table of a font.
+- text_width: Returns the width of a text in Excel column width units.
+- shift_row_dimensions: Moves the row heights of a sheet along with inserted or deleted rows.
+
+**********************************************************************************
+"""
+
+# Imports
+from functools import lru_cache
+import unicodedata
+from openpyxl.utils import get_column_letter
+
+# Character widths (1/1000 em) of the printable ASCII characters, from space (32) to ~ (126)
+arial_widths = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+arial_bold_widths = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+default_character_width = 556  # Width (1/1000 em) of the characters missing from the tables
+wide_character_width = 1000    # Width (1/1000 em) of the full width (east asian) characters
+digit_width_pixels = 7         # Width in pixels of a digit of the default font (Calibri 11), the column width unit
+column_padding = 2             # Extra width added to every column (column width units)
+max_column_width = 255         # Maximum column width accepted by Excel
+line_spacing = 1.3             # Height of a text line relative to the font size
+default_font_name = 'Arial'
+default_font_size = 11
+
+
+# Functions
+@lru_cache(maxsize=None)
+def character_widths(font_name=default_font_name, font_size=default_font_size, bold=False):
+    """
+    Returns the width of the printable ASCII characters of a font in Excel column width units.
+    Fonts other than Arial are measured with the Arial metrics. The table is computed once per font.
+
+    Args:
+        font_name (str): The name of the font.
+        font_size (float): The size of the font in points.
+        bold (bool): True for a bold font.
+
+    Returns:
+        dict: Character -> width in column width units.
+    """
+    widths = arial_bold_widths if bold else arial_widths
+    # em (1/1000) -> points -> pixels (96 dpi) -> column width units
+    scale = font_size / 1000 * 96 / 72 / digit_width_pixels
+    return {chr(code): width * scale for code, width in enumerate(widths, start=32)}
+
+
+def text_width(text, widths, font_size=default_font_size):
+    """
+    Returns the width of a text in Excel column width units, the width of its longest line for multi line texts.
+
+    Args:
+        text (str): The text to measure.
+        widths (dict): The character width table of the font (see character_widths).
+        font_size (float): The size of the font in points, used for the characters missing from the table.
+
+    Returns:
+        float: The width of the text.
+    """
+    scale = font_size / 1000 * 96 / 72 / digit_width_pixels
+    max_width = 0
+    for line in text.split('\n'):
+        width = 0
+        for character in line:
+            character_width = widths.get(character)
+            if character_width is None:
+                if unicodedata.east_asian_width(character) in ('W', 'F'):
+                    character_width = wide_character_width * scale
+                else:
+                    character_width = default_character_width * scale
+            width += character_width
+        max_width = max(max_width, width)
+    return max_width
+
+
+def shift_row_dimensions(sheet, from_row, offset):
+    """
+    Moves the row dimensions (heights) of the rows starting at from_row by offset rows, following the cells
+    moved by sheet.insert_rows(from_row, offset) or sheet.delete_rows(from_row, -offset), which openpyxl
+    doesn't do. The dimensions of the deleted rows are dropped.
+
+    Args:
+        sheet (openpyxl.worksheet.worksheet.Worksheet): The sheet.
+        from_row (int): The first inserted or deleted row.
+        offset (int): The number of inserted (positive) or deleted (negative) rows.
+
+    Returns:
+        None
+    """
+    row_dimensions = sheet.row_dimensions
+    # The rows are moved starting from the end when rows are inserted, so no dimension is overwritten
+    moved_rows = sorted((row_index for row_index in row_dimensions if row_index >= from_row), reverse=offset > 0)
+    for row_index in moved_rows:
+        dimension = row_dimensions.pop(row_index)
+        if row_index < from_row - offset:
+            # Dimension of a deleted row
+            continue
+        dimension.index = row_index + offset
+        row_dimensions[row_index + offset] = dimension
+
+
+# Classes
+class AutofitTracker:
+    """
+    Tracks the widest text of every column and the number of lines of every row while the rows are written,
+    then applies the column widths and row heights to the sheet at once.
+
+    Only the rows with more than one line get a height, Excel sizes the other rows to their font.
+    """
+
+    def __init__(self):
+        self.column_widths = {}   # Column index -> width of the widest text of the column
+        self.row_heights = {}     # Row index -> height of the multi line rows (points)
+
+    def track_row(self, row_index, values, font=None):
+        """
+        Updates the column widths and the row height with the values of a written row.
+
+        Args:
+            row_index (int): The index (starting at 1) of the row in the sheet.
+            values (iterable): The values of the row cells.
+            font (openpyxl.styles.Font, optional): The font of the row cells. Default is Arial 11.
+
+        Returns:
+            None
+        """
+        font_name = getattr(font, 'name', None) or default_font_name
+        font_size = getattr(font, 'size', None) or default_font_size
+        widths = character_widths(font_name, font_size, bool(getattr(font, 'b', False)))
+        column_widths = self.column_widths
+        max_lines = 1
+        for col, value in enumerate(values, start=1):
+            if value is None:
+                continue
+            text = str(value)
+            width = text_width(text, widths, font_size)
+            if width > column_widths.get(col, 0):
+                column_widths[col] = width
+            max_lines = max(max_lines, text.count('\n') + 1)
+        if max_lines > 1:
+            self.row_heights[row_index] = max_lines * font_size * line_spacing + 2
+
+    def shift_rows(self, from_row, offset):
+        """
+        Moves the tracked row heights of the rows starting at from_row by offset rows, when rows are inserted
+        (positive offset) or deleted (negative offset) in the sheet. The heights of the deleted rows are dropped.
+
+        Args:
+            from_row (int): The first inserted or deleted row.
+            offset (int): The number of inserted (positive) or deleted (negative) rows.
+
+        Returns:
+            None
+        """
+        self.row_heights = {row_index + offset if row_index >= from_row else row_index: height
+                            for row_index, height in self.row_heights.items()
+                            if not from_row <= row_index < from_row - offset}
+
+    def apply(self, sheet, keep_wider_columns=False):
+        """
+        Sets the tracked column widths and row heights on a sheet.
+
+        Args:
+            sheet (openpyxl.worksheet.worksheet.Worksheet): The sheet to autofit.
+            keep_wider_columns (bool): Keep the current width of the columns that are already wider, used when
+                                       only the rows added to an existing sheet were tracked.
+
+        Returns:
+            None
+        """
+        for col, width in self.column_widths.items():
+            dimension = sheet.column_dimensions[get_column_letter(col)]
+            width += column_padding
+            if keep_wider_columns and dimension.width:
+                width = max(width, dimension.width)
+            dimension.width = min(width, max_column_width)
+        for row_index, height in self.row_heights.items():
+            sheet.row_dimensions[row_index].height = height
@@ -0,0 +1,152 @@
+"""
+**********************************************************************************
+File: excel_sources.py
+
+Description:
+This module implements the sources index of the output Excel file, used by the
+append mode to only process the new and changed HTML files of a directory.
+
+The index is kept in a hidden "Sources" sheet of the workbook, with one row per
+HTML file: its name, size and modification time when it was written, and the
+first row and number of rows of its block in the results sheet. It is read with a
+read only (streaming) workbook before the run, so the unchanged files are skipped
+without loading the results sheet.
+
+Classes:
+- SourceEntry: Named tuple holding the index entry of an HTML file.
+
+Functions:
+- file_signature: Returns the size and modification time of a file.
+- index_from_rows: Builds the sources index from the rows of the Sources sheet.
+- read_sources_index: Reads the sources index of an Excel file with a read only workbook.
+- load_sources_index: Reads the sources index of a loaded workbook.
+- write_sources_index: Writes the sources index to the hidden sheet of a workbook.
+- split_changed_files: Splits the HTML files into the new or changed files and the unchanged files.
+
+**********************************************************************************
+"""
+
+# Imports
+from collections import namedtuple
+import os
+import openpyxl
+
+sources_sheet_name = "Sources"  # Name of the hidden sheet holding the sources index
+sources_headers = ['Source File', 'Size', 'Modified (ms)', 'First Row', 'Row Count']
+
+# Index entry of an HTML file: signature of the file and block of its rows in the results sheet
+SourceEntry = namedtuple('SourceEntry', ['size', 'mtime', 'first_row', 'row_count'])
+
+
+# Functions
+def file_signature(file_path):
+    """
+    Returns the size and modification time of a file, compared to detect the changed files.
+    The modification time is stored in milliseconds, an integer kept exactly by the Excel numbers.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        tuple: (size in bytes, modification time in milliseconds).
+    """
+    file_stat = os.stat(file_path)
+    return file_stat.st_size, file_stat.st_mtime_ns // 1000000
+
+
+def index_from_rows(rows):
+    """
+    Builds the sources index from the rows of the Sources sheet (header row included).
+
+    Args:
+        rows (iterable): The values of the rows of the sheet.
+
+    Returns:
+        dict: File name -> SourceEntry.
+    """
+    sources = {}
+    for row in rows:
+        if not row or row[0] is None or row[0] == sources_headers[0]:
+            continue
+        file, size, mtime, first_row, row_count = row[:5]
+        sources[file] = SourceEntry(int(size), int(mtime), int(first_row), int(row_count))
+    return sources
+
+
+def read_sources_index(excel_file_name):
+    """
+    Reads the sources index of an Excel file with a read only workbook, streaming the Sources sheet only.
+
+    Args:
+        excel_file_name (str): The name or path of the Excel file.
+
+    Returns:
+        dict: File name -> SourceEntry, or None if the file doesn't exist or has no sources index.
+    """
+    if not os.path.exists(excel_file_name):
+        return None
+    workbook = openpyxl.load_workbook(excel_file_name, read_only=True)
+    try:
+        if sources_sheet_name not in workbook.sheetnames:
+            return None
+        return index_from_rows(workbook[sources_sheet_name].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def load_sources_index(workbook):
+    """
+    Reads the sources index of a workbook loaded in memory.
+
+    Args:
+        workbook (openpyxl.Workbook): The workbook.
+
+    Returns:
+        dict: File name -> SourceEntry, empty if the workbook has no sources index.
+    """
+    if sources_sheet_name not in workbook.sheetnames:
+        return {}
+    return index_from_rows(workbook[sources_sheet_name].iter_rows(values_only=True))
+
+
+def write_sources_index(workbook, sources):
+    """
+    Writes the sources index to the hidden Sources sheet of a workbook, replacing the previous one.
+
+    Args:
+        workbook (openpyxl.Workbook): The workbook.
+        sources (dict): File name -> SourceEntry.
+
+    Returns:
+        None
+    """
+    if sources_sheet_name in workbook.sheetnames:
+        del workbook[sources_sheet_name]
+    sheet = workbook.create_sheet(sources_sheet_name)
+    sheet.sheet_state = 'hidden'
+    sheet.append(sources_headers)
+    for file, entry in sorted(sources.items(), key=lambda item: item[1].first_row):
+        sheet.append([file, *entry])
+
+
+def split_changed_files(file_paths, sources):
+    """
+    Splits the HTML files into the files that are new or changed since they were written (different
+    size or modification time) and the unchanged files.
+
+    Args:
+        file_paths (list): The paths of the HTML files.
+        sources (dict): File name -> SourceEntry.
+
+    Returns:
+        tuple: (list of the paths of the new or changed files, number of unchanged files).
+    """
+    changed_files = []
+    unchanged_files = 0
+    for file_path in file_paths:
+        entry = sources.get(os.path.basename(file_path))
+        if entry is not None and (entry.size, entry.mtime) == file_signature(file_path):
+            unchanged_files += 1
+        else:
+            changed_files.append(file_path)
+    return changed_files, unchanged_files
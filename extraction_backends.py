@@ -0,0 +1,342 @@
+"""
+**********************************************************************************
+File: extraction_backends.py
+
+Description:
+This module defines the interface used by the worker to extract the test table
+from the HTML files, and the registry of the available extraction backends.
+
+Every backend lives in its own module and is only imported when it is selected,
+so a backend whose dependency (for example selenium or lxml) is not installed is
+never imported.
+
+Available backends:
+- html_parser: Pure python parser built on html.parser (html_parser_backend.py).
+- lxml: Parser built on lxml.html, requires lxml (lxml_backend.py).
+- selenium: Renders the files in a headless Chrome WebDriver, requires selenium (selenium_backend.py).
+
+Classes:
+- ReportTable: Named tuple holding the headers, rows and overall result row of a report.
+- ExtractionBackend: Base class of all the extraction backends.
+
+Functions:
+- is_backend_available: Checks if the dependency of a backend is installed.
+- available_backends: Returns the names of the backends that can be used on this machine.
+- get_backend: Imports and creates the backend with the given name.
+- extract_in_order: Runs an extraction function on an executor and yields the results in input order.
+- failed_report: Returns the report of a file whose extraction failed, holding the error.
+- extract_safely: Runs an extraction function, returning a failed report instead of raising.
+- compact_report: Converts a report to tuples, the compact form sent back by worker processes.
+- extract_compact: Runs an extraction function and returns the compact report.
+- extract_compact_chunk: Runs an extraction function on a chunk of files and returns their compact reports.
+- extract_with_processes: Extracts the files in a pool of worker processes.
+- get_test_id: Returns the ATS test ID of a report from its file name.
+
+**********************************************************************************
+"""
+
+# Imports
+from collections import namedtuple, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import importlib
+import importlib.util
+import os
+import re
+
+# Named tuple holding the extracted data of a single HTML report.
+# extracted_by names the method that produced the report (for example fast_path or html_parser),
+# error holds the reason why the extraction failed for the failed reports (extracted_by "failed").
+ReportTable = namedtuple('ReportTable', ['headers', 'rows', 'overall_result', 'extracted_by', 'error'],
+                         defaults=(None, None))
+
+# Registry of the extraction backends: name -> (module name, class name, required module or None)
+extraction_backends = {
+    "html_parser": ("html_parser_backend", "HtmlParserBackend", None),
+    "lxml": ("lxml_backend", "LxmlBackend", "lxml"),
+    "selenium": ("selenium_backend", "SeleniumBackend", "selenium"),
+}
+default_backend = "html_parser"  # Backend used when no backend is selected
+test_id_pattern = re.compile(r'ATS-\d+')  # Test ID contained in the report file names (for example ATS-31693)
+failed_extraction = "failed"  # extracted_by of the reports whose extraction failed (malformed files)
+
+
+# Classes
+class ExtractionBackend:
+    """
+    Base class of the extraction backends.
+
+    A backend reads the test table of an HTML report and returns it as a ReportTable.
+    Backends can be used as context managers so that any resource they hold
+    (for example a browser) is released when the run ends.
+    """
+    name = None  # Name of the backend in the registry
+
+    def extract(self, file_path):
+        """
+        Extracts the test table of an HTML report.
+
+        Args:
+            file_path (str): The path of the HTML file.
+
+        Returns:
+            ReportTable: The headers, rows and overall result row of the report.
+        """
+        raise NotImplementedError
+
+    def extract_many(self, file_paths):
+        """
+        Extracts the test tables of several HTML reports.
+
+        Backends that can process several files in parallel override this method,
+        the reports are always returned in the order of file_paths.
+
+        Args:
+            file_paths (list): The paths of the HTML files.
+
+        Yields:
+            ReportTable: The report of every file, in the order of file_paths.
+        """
+        for file_path in file_paths:
+            yield extract_safely(self.extract, file_path)
+
+    def cache_key(self):
+        """
+        Returns the key of the reports extracted by this backend in the parse cache: the name of the backend
+        and the options changing the extracted reports, so a report extracted by another backend, or with
+        other options, is never served from the cache.
+
+        Returns:
+            str: The cache key of the backend.
+        """
+        return self.name
+
+    def get_bytes_parser(self):
+        """
+        Returns a picklable function parsing the content (bytes) of an HTML file, used by the
+        asyncio pipeline which reads the files itself.
+
+        Returns:
+            callable: Function taking the bytes of a file and returning a ReportTable,
+            or None if the backend can't parse files from memory (for example selenium).
+        """
+        return None
+
+    def close(self):
+        """
+        Releases the resources held by the backend.
+
+        Returns:
+            None
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Functions
+def is_backend_available(backend_name):
+    """
+    Checks if a backend is registered and its dependency is installed, without importing it.
+
+    Args:
+        backend_name (str): The name of the backend.
+
+    Returns:
+        bool: True if the backend can be used, False otherwise.
+    """
+    if backend_name not in extraction_backends:
+        return False
+    required_module = extraction_backends[backend_name][2]
+    return required_module is None or importlib.util.find_spec(required_module) is not None
+
+
+def available_backends():
+    """
+    Returns the names of the backends whose dependencies are installed.
+
+    Returns:
+        list: The names of the available backends, the default backend first.
+    """
+    names = [name for name in extraction_backends if is_backend_available(name)]
+    names.sort(key=lambda name: name != default_backend)
+    return names
+
+
+def get_backend(backend_name=default_backend, **backend_options):
+    """
+    Imports the module of a backend and creates an instance of it.
+
+    Args:
+        backend_name (str): The name of the backend.
+        **backend_options: Keyword arguments passed to the backend class.
+
+    Returns:
+        ExtractionBackend: The created backend.
+
+    Raises:
+        ValueError: If no backend is registered with the given name.
+        ImportError: If the dependency of the backend is not installed.
+    """
+    if backend_name not in extraction_backends:
+        raise ValueError(f"Unknown extraction backend: {backend_name}")
+    module_name, class_name, required_module = extraction_backends[backend_name]
+    if not is_backend_available(backend_name):
+        raise ImportError(f"The {backend_name} backend requires the {required_module} package")
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)(**backend_options)
+
+
+def extract_in_order(executor, extract_function, file_paths, max_pending):
+    """
+    Submits the files to an executor and yields the results in the order of file_paths.
+
+    At most max_pending files are submitted ahead of the result being yielded, so the
+    memory used by finished but not yet consumed results stays bounded.
+
+    Args:
+        executor (concurrent.futures.Executor): The executor running extract_function.
+        extract_function (callable): Function taking a file path and returning a ReportTable.
+        file_paths (list): The paths of the HTML files.
+        max_pending (int): The maximum number of submitted files not yet yielded.
+
+    Yields:
+        ReportTable: The result of extract_function for every file, in the order of file_paths.
+    """
+    pending = deque()
+    try:
+        for file_path in file_paths:
+            pending.append(executor.submit(extract_function, file_path))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Cancel the files that were not started yet if the consumer stops early or an error occurs
+        for future in pending:
+            future.cancel()
+
+
+def failed_report(error):
+    """
+    Returns the report of a file whose extraction failed, so the file is skipped and the run continues.
+
+    Args:
+        error (Exception): The error raised by the extraction.
+
+    Returns:
+        ReportTable: An empty report with extracted_by "failed" and the error message.
+    """
+    return ReportTable([], [], [], failed_extraction, str(error))
+
+
+def extract_safely(extract_function, file_path):
+    """
+    Runs an extraction function on a file, returning a failed report instead of raising when the file
+    can't be extracted (for example a malformed report without any test table).
+
+    Args:
+        extract_function (callable): Function taking a file path (or the content of the file) and returning a ReportTable.
+        file_path (str): The path of the HTML file, or its content.
+
+    Returns:
+        ReportTable: The report of the file, or a failed report (see failed_report).
+    """
+    try:
+        return extract_function(file_path)
+    except Exception as error:
+        return failed_report(error)
+
+
+def compact_report(report):
+    """
+    Converts a report to nested tuples, which are cheaper to send between processes than lists.
+
+    Args:
+        report (ReportTable): The report to convert.
+
+    Returns:
+        ReportTable: The same report with tuples instead of lists.
+    """
+    return ReportTable(tuple(report.headers), tuple(map(tuple, report.rows)), tuple(report.overall_result),
+                       report.extracted_by, report.error)
+
+
+def extract_compact(extract_function, file_path):
+    """
+    Runs an extraction function in a worker process and returns the compact form of its report.
+    A file that can't be extracted returns a failed report, so the other files of the chunk are still extracted.
+
+    Args:
+        extract_function (callable): Picklable function taking a file path (or the content of the file
+                                     for byte parsers) and returning a ReportTable.
+        file_path (str): The path of the HTML file, or its content.
+
+    Returns:
+        ReportTable: The compact report of the file.
+    """
+    return compact_report(extract_safely(extract_function, file_path))
+
+
+def extract_compact_chunk(extract_function, file_paths):
+    """
+    Runs an extraction function in a worker process on a chunk of files and returns their compact reports.
+
+    Args:
+        extract_function (callable): Picklable function taking a file path and returning a ReportTable.
+        file_paths (list): The paths of the HTML files of the chunk.
+
+    Returns:
+        list: The compact report of every file of the chunk, in order.
+    """
+    return [extract_compact(extract_function, file_path) for file_path in file_paths]
+
+
+def extract_with_processes(extract_function, file_paths, workers, chunk_size=None):
+    """
+    Extracts the files in a pool of worker processes, spreading the parsing over the CPU cores.
+
+    The files are submitted in chunks so the per task overhead stays low for small reports,
+    and only the compact row tuples of every report are sent back to the calling process.
+    At most two chunks per worker are submitted ahead of the reports being yielded (see extract_in_order),
+    so the memory used by the finished reports stays bounded.
+
+    Args:
+        extract_function (callable): Picklable (module level) function taking a file path and returning a ReportTable.
+        file_paths (list): The paths of the HTML files.
+        workers (int): The number of worker processes.
+        chunk_size (int): The number of files sent to a worker process in a single task.
+                          By default about 8 chunks per worker are used, at most 256 files per chunk.
+
+    Yields:
+        ReportTable: The compact report of every file, in the order of file_paths.
+    """
+    file_paths = list(file_paths)
+    if chunk_size is None:
+        chunk_size = max(1, min(256, len(file_paths) // (workers * 8)))
+    chunks = [file_paths[start:start + chunk_size] for start in range(0, len(file_paths), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for reports in extract_in_order(executor, partial(extract_compact_chunk, extract_function), chunks,
+                                        workers * 2):
+            yield from reports
+
+
+def get_test_id(file_path):
+    """
+    Returns the test ID of a report from its file name.
+
+    Args:
+        file_path (str): The path or name of the HTML file.
+
+    Returns:
+        str: The ATS test ID found in the file name (for example ATS-31693),
+        or the file name without extension if it doesn't contain one.
+    """
+    file_name = os.path.basename(file_path)
+    match = test_id_pattern.search(file_name)
+    if match:
+        return match.group()
+    return os.path.splitext(file_name)[0]
@@ -1293,11 +1293,19 @@ class Ui_MainWindow(object):
         self.status_textEdit.setReadOnly(True)
         self.status_textEdit.setObjectName("status_textEdit")
         self.gridLayout_3.addWidget(self.status_textEdit, 0, 0, 1, 1)
+        self.buttons_layout = QtWidgets.QHBoxLayout()
+        self.buttons_layout.setObjectName("buttons_layout")
         self.start_btn = QtWidgets.QPushButton(self.tab)
         self.start_btn.setMinimumSize(QtCore.QSize(150, 0))
         self.start_btn.setMaximumSize(QtCore.QSize(200, 40))
         self.start_btn.setObjectName("start_btn")
-        self.gridLayout_3.addWidget(self.start_btn, 3, 0, 1, 1, QtCore.Qt.AlignHCenter)
+        self.buttons_layout.addWidget(self.start_btn)
+        self.resume_btn = QtWidgets.QPushButton(self.tab)
+        self.resume_btn.setMinimumSize(QtCore.QSize(150, 0))
+        self.resume_btn.setMaximumSize(QtCore.QSize(200, 40))
+        self.resume_btn.setObjectName("resume_btn")
+        self.buttons_layout.addWidget(self.resume_btn)
+        self.gridLayout_3.addLayout(self.buttons_layout, 3, 0, 1, 1, QtCore.Qt.AlignHCenter)
         self.gridLayout_2 = QtWidgets.QGridLayout()
         self.gridLayout_2.setObjectName("gridLayout_2")
         self.browse_btn = QtWidgets.QPushButton(self.tab)
@@ -1326,6 +1334,48 @@ class Ui_MainWindow(object):
         self.clear_btn = QtWidgets.QPushButton(self.tab)
         self.clear_btn.setObjectName("clear_btn")
         self.gridLayout_2.addWidget(self.clear_btn, 1, 1, 1, 1)
+        self.options_layout = QtWidgets.QHBoxLayout()
+        self.options_layout.setObjectName("options_layout")
+        self.backend_label = QtWidgets.QLabel(self.tab)
+        self.backend_label.setObjectName("backend_label")
+        self.options_layout.addWidget(self.backend_label)
+        self.backend_comboBox = QtWidgets.QComboBox(self.tab)
+        self.backend_comboBox.setMinimumSize(QtCore.QSize(150, 0))
+        self.backend_comboBox.setObjectName("backend_comboBox")
+        self.options_layout.addWidget(self.backend_comboBox)
+        self.workers_label = QtWidgets.QLabel(self.tab)
+        self.workers_label.setObjectName("workers_label")
+        self.options_layout.addWidget(self.workers_label)
+        self.workers_spinBox = QtWidgets.QSpinBox(self.tab)
+        self.workers_spinBox.setMinimum(1)
+        self.workers_spinBox.setMaximum(64)
+        self.workers_spinBox.setObjectName("workers_spinBox")
+        self.options_layout.addWidget(self.workers_spinBox)
+        self.summary_checkBox = QtWidgets.QCheckBox(self.tab)
+        self.summary_checkBox.setObjectName("summary_checkBox")
+        self.options_layout.addWidget(self.summary_checkBox)
+        self.append_checkBox = QtWidgets.QCheckBox(self.tab)
+        self.append_checkBox.setObjectName("append_checkBox")
+        self.options_layout.addWidget(self.append_checkBox)
+        self.cache_checkBox = QtWidgets.QCheckBox(self.tab)
+        self.cache_checkBox.setChecked(True)
+        self.cache_checkBox.setObjectName("cache_checkBox")
+        self.options_layout.addWidget(self.cache_checkBox)
+        self.duplicates_checkBox = QtWidgets.QCheckBox(self.tab)
+        self.duplicates_checkBox.setObjectName("duplicates_checkBox")
+        self.options_layout.addWidget(self.duplicates_checkBox)
+        self.csv_checkBox = QtWidgets.QCheckBox(self.tab)
+        self.csv_checkBox.setObjectName("csv_checkBox")
+        self.options_layout.addWidget(self.csv_checkBox)
+        self.jsonl_checkBox = QtWidgets.QCheckBox(self.tab)
+        self.jsonl_checkBox.setObjectName("jsonl_checkBox")
+        self.options_layout.addWidget(self.jsonl_checkBox)
+        self.sqlite_checkBox = QtWidgets.QCheckBox(self.tab)
+        self.sqlite_checkBox.setObjectName("sqlite_checkBox")
+        self.options_layout.addWidget(self.sqlite_checkBox)
+        spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.options_layout.addItem(spacerItem)
+        self.gridLayout_2.addLayout(self.options_layout, 2, 0, 1, 1)
         self.gridLayout_3.addLayout(self.gridLayout_2, 2, 0, 1, 1)
         self.progressBar = QtWidgets.QProgressBar(self.tab)
         self.progressBar.setProperty("value", 0)
@@ -1370,9 +1420,28 @@ class Ui_MainWindow(object):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "Auto-Test Summarizer"))
         self.start_btn.setText(_translate("MainWindow", "start"))
+        self.resume_btn.setText(_translate("MainWindow", "resume"))
+        self.resume_btn.setToolTip(_translate("MainWindow", "Resume the interrupted run from its last saved checkpoint"))
         self.browse_btn.setText(_translate("MainWindow", "Browse"))
         self.browse_label.setText(_translate("MainWindow", "browse to select the HTML directory..."))
         self.clear_btn.setText(_translate("MainWindow", "Clear Logs"))
+        self.backend_label.setText(_translate("MainWindow", "Extraction backend:"))
+        self.workers_label.setText(_translate("MainWindow", "Workers:"))
+        self.workers_spinBox.setToolTip(_translate("MainWindow", "Number of files processed in parallel (worker processes for the parser backends, Chrome instances for the selenium backend)"))
+        self.summary_checkBox.setToolTip(_translate("MainWindow", "Only read the overall result of every file and write one row per file to Tests_Summary.xlsx"))
+        self.summary_checkBox.setText(_translate("MainWindow", "Summary only"))
+        self.append_checkBox.setToolTip(_translate("MainWindow", "Keep the existing Excel file and only process the new and changed HTML files"))
+        self.append_checkBox.setText(_translate("MainWindow", "Append"))
+        self.cache_checkBox.setToolTip(_translate("MainWindow", "Read the unchanged reports from the parse cache (Parse_Cache.db) instead of parsing them again"))
+        self.cache_checkBox.setText(_translate("MainWindow", "Parse cache"))
+        self.duplicates_checkBox.setToolTip(_translate("MainWindow", "Only parse and write the first of the HTML files having the same content"))
+        self.duplicates_checkBox.setText(_translate("MainWindow", "Skip duplicates"))
+        self.csv_checkBox.setToolTip(_translate("MainWindow", "Also write the rows to a CSV file next to the Excel file"))
+        self.csv_checkBox.setText(_translate("MainWindow", "CSV"))
+        self.jsonl_checkBox.setToolTip(_translate("MainWindow", "Also write the rows to a JSON Lines file next to the Excel file"))
+        self.jsonl_checkBox.setText(_translate("MainWindow", "JSON Lines"))
+        self.sqlite_checkBox.setToolTip(_translate("MainWindow", "Also add the results of the run to the SQLite result store (Tests_Results.db)"))
+        self.sqlite_checkBox.setText(_translate("MainWindow", "SQLite"))
         self.tool_name_label.setText(_translate("MainWindow", "Auto-Test Summarizer"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab), _translate("MainWindow", "Main Tab"))
 import r_rc
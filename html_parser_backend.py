@@ -0,0 +1,635 @@
+"""
+**********************************************************************************
+File: html_parser_backend.py
+
+Description:
+This module reads the test table of an ATS HTML report directly from disk using
+the standard library html.parser module. It returns the same headers, rows and
+overall result row that the Selenium based extraction reads from the browser,
+without starting a browser or paying a WebDriver round trip per cell.
+
+The parser is tolerant to the markup produced by the test rigs, for example
+rows that are never closed with </tr> (see Tests/ATS-31693.html).
+
+Files with the exact layout of the ATS reports (one table, a <th> header row, <td>
+step rows and a final colspan "Test Result : PASSED/FAILED" row) are read by a fast
+byte level scanner built on precompiled regular expressions. Any deviation from
+this layout is detected and the file falls back to the full parser. Every report
+records the method that extracted it in ReportTable.extracted_by (fast_path,
+html_parser or streamed), so the fast path hits and fallbacks can be counted.
+
+Very large reports are streamed: the file is memory mapped, the overall result row
+is read from the end of the first table (found in the tail of the file, or by a scan of
+the table tags when the tail shows more than one table) and the
+step rows are parsed chunk by chunk and yielded as a generator, so the memory used
+doesn't depend on the size of the report.
+
+Classes:
+- ReportTableParser: html.parser based parser collecting the first table of a report.
+- HtmlParserBackend: Extraction backend using ReportTableParser.
+
+Functions:
+- normalize_cell_text: Normalizes the text of a cell the same way the browser renders it.
+- parse_html_text: Parses HTML text and returns the headers, rows and overall result row.
+- parse_html_bytes: Decodes the content of an HTML file and returns the headers, rows and overall result row.
+- parse_html_report: Reads an HTML file and returns the headers, rows and overall result row.
+- clean_cell_bytes: Decodes and normalizes the content of a cell read by the fast path scanner.
+- scan_ats_report: Fast path scanner for the known ATS report layout.
+- extract_html_bytes: Extracts a report with the fast path scanner, falling back to the full parser.
+- extract_html_report: Reads an HTML file and extracts its report with extract_html_bytes.
+- find_first_table_end: Returns the offset of the </table> tag closing the first table of an HTML document.
+- find_tail_table_end: Returns the offset of the </table> tag closing the table in the tail of an HTML document.
+- find_last_row_offset: Returns the offset of the last <tr> tag of an HTML document.
+- parse_row_fragment: Parses the cells of a single table row.
+- iter_streamed_rows: Parses a memory mapped HTML file chunk by chunk and yields the table rows.
+- stream_html_report: Returns the report of a memory mapped HTML file with its rows as a generator.
+- read_overall_result: Reads the overall result row of an HTML file from the end of its first table.
+
+**********************************************************************************
+"""
+
+# Imports
+from html.parser import HTMLParser
+from functools import partial
+from itertools import chain
+import codecs
+import html
+import mmap
+import os
+import re
+from extraction_backends import ExtractionBackend, ReportTable, extract_with_processes
+
+# Tags that start a new line in the rendered text of a cell
+line_break_tags = ('br', 'p', 'div', 'li')
+stream_chunk_size = 1 << 20  # Number of bytes parsed at once when a report is streamed
+
+# Precompiled regular expressions of the fast path scanner (known ATS report layout)
+table_tag_pattern = re.compile(rb'<table\b', re.IGNORECASE)
+table_tags_pattern = re.compile(rb'<(/?)table\b')  # Opening and closing table tags, searched in lowercased data
+table_tag_overlap = 8  # Bytes kept between two scanned chunks, so a table tag split between them is found
+tail_window_size = 4096  # Bytes read first from the end of a file to find the end of its table and its last row
+table_pattern = re.compile(rb'<table(?:\s[^<>]*)?>(.*?)</table>', re.DOTALL)
+header_row_pattern = re.compile(rb'\s*<tr>((?:\s*<th>[^<]*</th>)+)\s*</tr>')
+header_cell_pattern = re.compile(rb'<th>([^<]*)</th>')
+step_row_pattern = re.compile(rb'\s*<tr>((?:\s*<td>[^<]*</td>)+)(?:\s*</tr>)?')
+step_cell_pattern = re.compile(rb'<td>([^<]*)</td>')
+result_row_pattern = re.compile(rb'\s*<tr>\s*<td colspan="?\d+"?>\s*(?:<p(?:\s[^<>]*)?>)?'
+                                rb'(\s*Test Result\s*:\s*(?:PASSED|FAILED)\s*)(?:</p>)?\s*</td>\s*(?:</tr>)?\s*')
+
+
+# Functions
+def normalize_cell_text(text):
+    """
+    Normalizes the text of a table cell the same way the browser renders it.
+
+    Whitespace inside every line is collapsed to a single space, and empty lines
+    and leading/trailing whitespace are removed.
+
+    Args:
+        text (str): The raw text collected from the cell.
+
+    Returns:
+        str: The normalized cell text.
+    """
+    lines = (' '.join(line.split()) for line in text.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+# Classes
+class ReportTableParser(HTMLParser):
+    """
+    Collects the header cells and the data rows of the first table in an HTML document.
+
+    Header (th) cells are collected in a single list, data (td) cells are collected
+    row by row. Rows without any td cell (like the header row) are dropped, matching
+    what the Selenium extraction returns.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.headers = []          # Texts of all th cells of the table
+        self.rows = []             # Lists of td cell texts, one list per table row
+        self.table_found = False   # Flag set when the first table is opened
+        self._table_depth = 0      # Nesting depth inside the first table
+        self._table_done = False   # Flag set when the first table is closed
+        self._row = None           # td cell texts of the row being parsed
+        self._cell = None          # Text parts of the cell being parsed
+        self._cell_tag = None      # Tag of the cell being parsed (td or th)
+
+    def handle_starttag(self, tag, attrs):
+        if self._table_done:
+            return
+        if tag == 'table':
+            self.table_found = True
+            self._table_depth += 1
+            return
+        # Only the structure of the first table is interpreted, nested tables are read as cell text
+        if self._table_depth != 1:
+            if self._cell is not None and tag in line_break_tags:
+                self._cell.append('\n')
+            return
+        if tag == 'tr':
+            # A new row implicitly closes the previous one (handles missing </tr> tags)
+            self._close_row()
+            self._row = []
+        elif tag in ('td', 'th'):
+            self._close_cell()
+            if self._row is None:
+                self._row = []
+            self._cell = []
+            self._cell_tag = tag
+        elif self._cell is not None and tag in line_break_tags:
+            self._cell.append('\n')
+
+    def handle_endtag(self, tag):
+        if self._table_done or not self._table_depth:
+            return
+        if tag == 'table':
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._close_row()
+                self._table_done = True
+            return
+        if self._table_depth != 1:
+            if self._cell is not None and tag in line_break_tags:
+                self._cell.append('\n')
+            return
+        if tag == 'tr':
+            self._close_row()
+        elif tag in ('td', 'th'):
+            self._close_cell()
+        elif self._cell is not None and tag in line_break_tags:
+            self._cell.append('\n')
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def close(self):
+        super().close()
+        # Close any row left open by a truncated document
+        if self._table_depth:
+            self._close_row()
+
+    def _close_cell(self):
+        if self._cell is None:
+            return
+        text = normalize_cell_text(''.join(self._cell))
+        if self._cell_tag == 'th':
+            self.headers.append(text)
+        else:
+            self._row.append(text)
+        self._cell = None
+        self._cell_tag = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row:
+            self.rows.append(self._row)
+        self._row = None
+
+
+def parse_html_text(html_text):
+    """
+    Parses the first table of an ATS HTML report.
+
+    Args:
+        html_text (str): The HTML content of the report.
+
+    Returns:
+        ReportTable: (headers, rows, overall_result) where headers is a list of the header
+        texts, rows is a list of rows (lists of cell texts) and overall_result is the last
+        row of the table holding the test result summary.
+
+    Raises:
+        ValueError: If the HTML doesn't contain a table or the table doesn't contain any rows.
+    """
+    parser = ReportTableParser()
+    parser.feed(html_text)
+    parser.close()
+    if not parser.table_found:
+        raise ValueError("No table found in the HTML file")
+    if not parser.rows:
+        raise ValueError("The HTML table doesn't contain any test rows")
+    table_data = parser.rows
+    # The last row of the table contains the test result summary [pass or fail]
+    overall_test_result = table_data.pop()
+    return ReportTable(parser.headers, table_data, overall_test_result, "html_parser")
+
+
+def parse_html_bytes(html_bytes, encoding='utf-8'):
+    """
+    Decodes the content of an ATS HTML report and parses its test table.
+
+    Args:
+        html_bytes (bytes): The content of the HTML file.
+        encoding (str): The encoding used to decode the content. Undecodable bytes are replaced.
+
+    Returns:
+        ReportTable: The headers, rows and overall result row as returned by parse_html_text.
+    """
+    return parse_html_text(html_bytes.decode(encoding, errors='replace'))
+
+
+def parse_html_report(file_path, encoding='utf-8'):
+    """
+    Reads an ATS HTML report from disk and parses its test table.
+
+    Args:
+        file_path (str): The path of the HTML file.
+        encoding (str): The encoding used to decode the file. Undecodable bytes are replaced.
+
+    Returns:
+        ReportTable: The headers, rows and overall result row as returned by parse_html_text.
+    """
+    with open(file_path, 'rb') as html_file:
+        return parse_html_bytes(html_file.read(), encoding)
+
+
+def clean_cell_bytes(cell, encoding):
+    """
+    Decodes the content of a cell read by the fast path scanner and normalizes it like the full parser.
+
+    Args:
+        cell (bytes): The raw content of the cell (without any tag).
+        encoding (str): The encoding used to decode the content. Undecodable bytes are replaced.
+
+    Returns:
+        str: The normalized cell text.
+    """
+    text = cell.decode(encoding, errors='replace')
+    if '&' in text:
+        text = html.unescape(text)
+    return normalize_cell_text(text)
+
+
+def scan_ats_report(html_bytes, encoding='utf-8'):
+    """
+    Fast path scanner for the known ATS report layout.
+
+    The whole table must match the layout: a single table, a header row of th cells, step rows
+    of td cells without any markup inside the cells (the closing </tr> may be missing) and a
+    last colspan row holding "Test Result : PASSED" or "Test Result : FAILED". Anything else is
+    a deviation and None is returned so that the file is read by the full parser.
+
+    Args:
+        html_bytes (bytes): The content of the HTML file.
+        encoding (str): The encoding used to decode the cells.
+
+    Returns:
+        ReportTable: The report of the file, or None if the file deviates from the known layout.
+    """
+    if len(table_tag_pattern.findall(html_bytes)) != 1:
+        return None
+    table_match = table_pattern.search(html_bytes)
+    if table_match is None:
+        return None
+    table_body = table_match.group(1)
+    header_match = header_row_pattern.match(table_body)
+    if header_match is None:
+        return None
+    headers = [clean_cell_bytes(cell, encoding) for cell in header_cell_pattern.findall(header_match.group(1))]
+    table_data = []
+    position = header_match.end()
+    row_match = step_row_pattern.match(table_body, position)
+    while row_match is not None:
+        table_data.append([clean_cell_bytes(cell, encoding) for cell in step_cell_pattern.findall(row_match.group(1))])
+        position = row_match.end()
+        row_match = step_row_pattern.match(table_body, position)
+    # The result row must be the last row and the end of the table
+    result_match = result_row_pattern.fullmatch(table_body, position)
+    if result_match is None:
+        return None
+    overall_test_result = [clean_cell_bytes(result_match.group(1), encoding)]
+    return ReportTable(headers, table_data, overall_test_result, "fast_path")
+
+
+def extract_html_bytes(html_bytes, encoding='utf-8', fast_path=True):
+    """
+    Extracts the report of an HTML file with the fast path scanner, falling back to the full parser
+    when the file deviates from the known ATS layout.
+
+    Args:
+        html_bytes (bytes): The content of the HTML file.
+        encoding (str): The encoding used to decode the content.
+        fast_path (bool): False to always use the full parser.
+
+    Returns:
+        ReportTable: The report of the file, extracted_by tells which method was used.
+    """
+    if fast_path:
+        report = scan_ats_report(html_bytes, encoding)
+        if report is not None:
+            return report
+    return parse_html_bytes(html_bytes, encoding)
+
+
+def extract_html_report(file_path, encoding='utf-8', fast_path=True):
+    """
+    Reads an HTML file from disk and extracts its report with extract_html_bytes.
+
+    Args:
+        file_path (str): The path of the HTML file.
+        encoding (str): The encoding used to decode the file.
+        fast_path (bool): False to always use the full parser.
+
+    Returns:
+        ReportTable: The report of the file.
+    """
+    with open(file_path, 'rb') as html_file:
+        return extract_html_bytes(html_file.read(), encoding, fast_path)
+
+
+def find_first_table_end(html_file, chunk_size=stream_chunk_size):
+    """
+    Returns the offset of the </table> tag closing the first table of an HTML document, as the full parser
+    reads it: the tables nested in the first table are skipped and the tables after it are ignored.
+
+    The table tags are searched chunk by chunk from the start of the file. The scanned pages of a memory
+    mapped file are released, so the resident memory stays bounded.
+
+    Args:
+        html_file (file or mmap.mmap): The HTML file opened in binary mode, or its memory map.
+        chunk_size (int): The number of bytes scanned at once.
+
+    Returns:
+        int: The offset of the </table> tag closing the first table, or None if the document doesn't
+        contain a closed table.
+    """
+    release_pages = (isinstance(html_file, mmap.mmap) and hasattr(html_file, 'madvise')
+                     and hasattr(mmap, 'MADV_DONTNEED') and chunk_size % mmap.PAGESIZE == 0)
+    html_file.seek(0)
+    table_depth = 0
+    data = b''
+    data_start = 0  # Offset of data in the file
+    while True:
+        chunk_start = html_file.tell()
+        chunk = html_file.read(chunk_size)
+        if release_pages and chunk:
+            html_file.madvise(mmap.MADV_DONTNEED, chunk_start, len(chunk))
+        data += chunk.lower()
+        # The tags starting in the last bytes of the data are searched again with the next chunk
+        search_end = len(data) - table_tag_overlap if chunk else len(data)
+        for match in table_tags_pattern.finditer(data):
+            if match.start() >= search_end:
+                break
+            if not match.group(1):
+                table_depth += 1
+            elif table_depth:
+                table_depth -= 1
+                if not table_depth:
+                    return data_start + match.start()
+        if not chunk:
+            return None
+        kept_bytes = len(data) - max(search_end, 0)
+        data_start += len(data) - kept_bytes
+        data = data[-kept_bytes:] if kept_bytes else b''
+
+
+def find_tail_table_end(html_file, window_size):
+    """
+    Returns the offset of the </table> tag closing the table of an HTML document when its tail shows a single
+    table: the only table tag of the tail is a closing tag (or the tail is the whole document and holds one table).
+
+    Only the tail is read, so the end of the table of a report is found without reading the whole file.
+
+    Args:
+        html_file (file or mmap.mmap): The HTML file opened in binary mode, or its memory map.
+        window_size (int): The number of bytes read from the end of the file.
+
+    Returns:
+        int: The offset of the </table> tag, or None if the tail contains other table tags (nested tables,
+        tables after the first one) or none (truncated report), the end of the first table must then be
+        found with find_first_table_end.
+    """
+    html_file.seek(0, os.SEEK_END)
+    file_end = html_file.tell()
+    start = max(0, file_end - window_size)
+    html_file.seek(start)
+    tags = list(table_tags_pattern.finditer(html_file.read(file_end - start).lower()))
+    if start == 0 and len(tags) == 2 and not tags[0].group(1):
+        # The tail is the whole document, its first tag opens the table
+        tags = tags[1:]
+    if len(tags) != 1 or not tags[0].group(1):
+        return None
+    return start + tags[0].start()
+
+
+def find_last_row_offset(data, end=None, window_size=1 << 16):
+    """
+    Returns the offset of the last <tr> tag in an HTML document.
+
+    Only a window at the end of the data is searched, the window is doubled until a row is found,
+    so the pages at the beginning of a memory mapped file are not touched.
+
+    Args:
+        data (bytes or mmap.mmap): The content of the HTML file.
+        end (int): Only the data before this offset is searched. By default the whole data is searched.
+        window_size (int): The size of the first searched window.
+
+    Returns:
+        int: The offset of the last <tr> tag, or -1 if the document doesn't contain any row.
+    """
+    end = len(data) if end is None else end
+    window_start = end
+    while window_start > 0:
+        window_start = max(0, window_start - window_size)
+        position = end
+        while True:
+            offset = max(data.rfind(b'<tr', window_start, position), data.rfind(b'<TR', window_start, position))
+            if offset < 0:
+                break
+            # Skipping other tags starting with "tr" (for example <track>)
+            if data[offset + 3:offset + 4] in (b'>', b' ', b'/', b'\t', b'\r', b'\n'):
+                return offset
+            position = offset
+        window_size *= 2
+    return -1
+
+
+def parse_row_fragment(row_html):
+    """
+    Parses the td cells of a single table row given as an HTML fragment.
+
+    Args:
+        row_html (str): The HTML of the row, starting with its <tr> tag.
+
+    Returns:
+        list: The texts of the td cells of the row, or None if the fragment doesn't contain any td cell.
+    """
+    parser = ReportTableParser()
+    parser.feed('<table>' + row_html)
+    parser.close()
+    return parser.rows[-1] if parser.rows else None
+
+
+def iter_streamed_rows(html_file, mapped_file, parser, end, encoding, chunk_size):
+    """
+    Parses a memory mapped HTML file chunk by chunk and yields the table rows as soon as they are complete.
+
+    The file and its memory map are closed when the generator is exhausted or closed.
+
+    Args:
+        html_file (file): The opened HTML file.
+        mapped_file (mmap.mmap): The memory map of the HTML file.
+        parser (ReportTableParser): The parser the chunks are fed to.
+        end (int): The offset where the parsing stops (the start of the overall result row).
+        encoding (str): The encoding used to decode the file. Undecodable bytes are replaced.
+        chunk_size (int): The number of bytes fed to the parser at once.
+
+    Yields:
+        list: The td cell texts of every row before the end offset.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    # Releasing the parsed pages keeps the resident memory bounded (chunk_size is a multiple of the page size)
+    release_pages = hasattr(mapped_file, 'madvise') and hasattr(mmap, 'MADV_DONTNEED') and chunk_size % mmap.PAGESIZE == 0
+    try:
+        for start in range(0, end, chunk_size):
+            chunk_end = min(start + chunk_size, end)
+            parser.feed(decoder.decode(mapped_file[start:chunk_end]))
+            if release_pages:
+                mapped_file.madvise(mmap.MADV_DONTNEED, start, chunk_end - start)
+            if parser.rows:
+                rows, parser.rows = parser.rows, []
+                yield from rows
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+        yield from parser.rows
+    finally:
+        mapped_file.close()
+        html_file.close()
+
+
+def stream_html_report(file_path, encoding='utf-8', chunk_size=stream_chunk_size):
+    """
+    Reads an ATS HTML report incrementally from a memory mapped file.
+
+    The overall result row is read from the end of the first table (it is the last row of the table),
+    then the step rows are parsed chunk by chunk while they are consumed, so only a chunk of
+    the file and a few rows are held in memory whatever the size of the report is.
+
+    Args:
+        file_path (str): The path of the HTML file.
+        encoding (str): The encoding used to decode the file. Undecodable bytes are replaced.
+        chunk_size (int): The number of bytes parsed at once.
+
+    Returns:
+        ReportTable: The headers, a generator of the step rows and the overall result row of the report.
+
+    Raises:
+        ValueError: If the HTML doesn't contain a table or the table doesn't contain any rows.
+    """
+    html_file = open(file_path, 'rb')
+    try:
+        if os.fstat(html_file.fileno()).st_size == 0:
+            raise ValueError("No table found in the HTML file")
+        mapped_file = mmap.mmap(html_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+        html_file.close()
+        raise
+    try:
+        # The last row of the first table contains the test result summary [pass or fail],
+        # the tables after it (if any) are not part of the report
+        table_end = find_tail_table_end(mapped_file, tail_window_size)
+        if table_end is None:
+            table_end = find_first_table_end(mapped_file)
+        result_offset = find_last_row_offset(mapped_file, table_end)
+        overall_test_result = None
+        if result_offset >= 0:
+            overall_test_result = parse_row_fragment(
+                mapped_file[result_offset:table_end].decode(encoding, errors='replace'))
+        if overall_test_result is None:
+            raise ValueError("The HTML table doesn't contain any test rows")
+    except Exception:
+        mapped_file.close()
+        html_file.close()
+        raise
+    parser = ReportTableParser()
+    rows = iter_streamed_rows(html_file, mapped_file, parser, result_offset, encoding, chunk_size)
+    # Reading up to the first step row, the header row comes before it
+    first_row = next(rows, None)
+    if not parser.table_found:
+        rows.close()
+        raise ValueError("No table found in the HTML file")
+    if first_row is None:
+        return ReportTable(parser.headers, iter(()), overall_test_result, "streamed")
+    return ReportTable(parser.headers, chain([first_row], rows), overall_test_result, "streamed")
+
+
+def read_overall_result(file_path, encoding='utf-8', window_size=tail_window_size):
+    """
+    Reads the overall result row (the last row of the first table) of an HTML file without parsing the table.
+
+    The end of the table is found in the tail of the file. When the tail shows more than one table (nested
+    tables, tables after the report), the end of the first table is found by a scan of the table tags from
+    the start of the file (the tables after it are not part of the report). Then a small window before it
+    is read, and it is widened only if it doesn't contain a complete row with td cells.
+
+    Args:
+        file_path (str): The path of the HTML file.
+        encoding (str): The encoding used to decode the file. Undecodable bytes are replaced.
+        window_size (int): The number of bytes read first from the end of the file.
+
+    Returns:
+        list: The td cell texts of the overall result row, for example ['Test Result : PASSED'].
+
+    Raises:
+        ValueError: If the file doesn't contain any table row with td cells.
+    """
+    with open(file_path, 'rb') as html_file:
+        table_end = find_tail_table_end(html_file, window_size)
+        if table_end is None:
+            table_end = find_first_table_end(html_file)
+        if table_end is None:
+            # No closed table (truncated report), its last row is read from the end of the file
+            table_end = html_file.seek(0, os.SEEK_END)
+        while True:
+            start = max(0, table_end - window_size)
+            html_file.seek(start)
+            data = html_file.read(table_end - start)
+            # Rows without td cells (like the header row) are skipped, as the full parser does
+            end = len(data)
+            offset = find_last_row_offset(data, end)
+            while offset >= 0:
+                row = parse_row_fragment(data[offset:end].decode(encoding, errors='replace'))
+                if row is not None:
+                    return row
+                end = offset
+                offset = find_last_row_offset(data, end)
+            if start == 0:
+                raise ValueError("The HTML table doesn't contain any test rows")
+            window_size *= 4
+
+
+class HtmlParserBackend(ExtractionBackend):
+    """
+    Extraction backend reading the HTML files directly from disk with ReportTableParser.
+
+    With workers > 1, extract_many() parses the files in a pool of worker processes.
+    Files of at least stream_threshold bytes are streamed (see stream_html_report): their
+    rows are returned as a generator. Streamed reports are only kept streaming when they
+    are extracted in this process, worker processes send back all their rows.
+    """
+    name = "html_parser"
+
+    def __init__(self, encoding='utf-8', workers=1, stream_threshold=None, fast_path=True):
+        self.encoding = encoding                  # Encoding used to decode the HTML files
+        self.workers = max(1, int(workers))       # Number of worker processes used by extract_many()
+        self.stream_threshold = stream_threshold  # Minimum file size (bytes) of the streamed files, None to disable
+        self.fast_path = fast_path                # Use the fast path scanner for files with the known ATS layout
+
+    def extract(self, file_path):
+        if self.stream_threshold is not None and os.path.getsize(file_path) >= self.stream_threshold:
+            return stream_html_report(file_path, self.encoding)
+        return extract_html_report(file_path, self.encoding, self.fast_path)
+
+    def extract_many(self, file_paths):
+        if self.workers == 1:
+            return super().extract_many(file_paths)
+        return extract_with_processes(self.extract, file_paths, self.workers)
+
+    def cache_key(self):
+        return f"{self.name}(encoding={self.encoding}, fast_path={self.fast_path})"
+
+    def get_bytes_parser(self):
+        return partial(extract_html_bytes, encoding=self.encoding, fast_path=self.fast_path)
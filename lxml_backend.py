@@ -0,0 +1,146 @@
+"""
+**********************************************************************************
+File: lxml_backend.py
+
+Description:
+This module implements an extraction backend built on the lxml.html parser.
+lxml is an optional dependency, this module is only imported by the backend
+registry (extraction_backends.py) when lxml is installed and the backend is selected.
+
+Classes:
+- LxmlBackend: Extraction backend reading the HTML files with lxml.html.
+
+Functions:
+- collect_text: Collects the text parts of an element and its children.
+- element_text: Returns the rendered text of an element.
+- parse_html_bytes: Parses the content of an HTML file and returns its test table.
+- parse_lxml_report: Reads an HTML file and returns its test table.
+
+**********************************************************************************
+"""
+
+# Imports
+from functools import partial
+import lxml.etree
+import lxml.html
+from extraction_backends import ExtractionBackend, ReportTable, extract_with_processes
+from html_parser_backend import line_break_tags, normalize_cell_text
+
+
+# Functions
+def collect_text(element, parts):
+    """
+    Appends the text of an element and its children to a list, adding a line break around br and block tags.
+
+    Args:
+        element (lxml.html.HtmlElement): The element to collect the text of.
+        parts (list): The list the text parts are appended to.
+
+    Returns:
+        None
+    """
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        # Comments and processing instructions don't have a string tag, only their tail is text
+        if isinstance(child.tag, str):
+            if child.tag in line_break_tags:
+                parts.append('\n')
+            collect_text(child, parts)
+            if child.tag in line_break_tags:
+                parts.append('\n')
+        if child.tail:
+            parts.append(child.tail)
+
+
+def element_text(element):
+    """
+    Returns the rendered text of an element, keeping the line breaks of br and block tags.
+
+    Args:
+        element (lxml.html.HtmlElement): The element to read the text of.
+
+    Returns:
+        str: The normalized text of the element.
+    """
+    parts = []
+    collect_text(element, parts)
+    return normalize_cell_text(''.join(parts))
+
+
+def parse_html_bytes(html_bytes, encoding='utf-8'):
+    """
+    Parses the first table of an ATS HTML report with lxml.
+
+    Args:
+        html_bytes (bytes): The content of the HTML file.
+        encoding (str): The encoding used to decode the content.
+
+    Returns:
+        ReportTable: The headers, rows and overall result row of the report.
+
+    Raises:
+        ValueError: If the HTML doesn't contain a table or the table doesn't contain any rows.
+    """
+    parser = lxml.html.HTMLParser(encoding=encoding)
+    try:
+        document = lxml.html.document_fromstring(html_bytes, parser=parser)
+    except lxml.etree.ParserError:
+        raise ValueError("No table found in the HTML file")
+    table = document.find('.//table')
+    if table is None:
+        raise ValueError("No table found in the HTML file")
+    headers = [element_text(header) for header in table.iter('th')]
+    table_data = []
+    for row in table.iter('tr'):
+        cell_data = [element_text(cell) for cell in row.iter('td')]
+        if cell_data:
+            table_data.append(cell_data)
+    if not table_data:
+        raise ValueError("The HTML table doesn't contain any test rows")
+    # The last row of the table contains the test result summary [pass or fail]
+    overall_test_result = table_data.pop()
+    return ReportTable(headers, table_data, overall_test_result, "lxml")
+
+
+def parse_lxml_report(file_path, encoding='utf-8'):
+    """
+    Reads an ATS HTML report from disk and parses its test table with lxml.
+
+    Args:
+        file_path (str): The path of the HTML file.
+        encoding (str): The encoding used to decode the file.
+
+    Returns:
+        ReportTable: The headers, rows and overall result row of the report.
+    """
+    with open(file_path, 'rb') as html_file:
+        return parse_html_bytes(html_file.read(), encoding)
+
+
+# Classes
+class LxmlBackend(ExtractionBackend):
+    """
+    Extraction backend reading the HTML files directly from disk with lxml.html.
+
+    With workers > 1, extract_many() parses the files in a pool of worker processes.
+    """
+    name = "lxml"
+
+    def __init__(self, encoding='utf-8', workers=1):
+        self.encoding = encoding             # Encoding used to decode the HTML files
+        self.workers = max(1, int(workers))  # Number of worker processes used by extract_many()
+
+    def extract(self, file_path):
+        return parse_lxml_report(file_path, self.encoding)
+
+    def extract_many(self, file_paths):
+        if self.workers == 1:
+            return super().extract_many(file_paths)
+        return extract_with_processes(partial(parse_lxml_report, encoding=self.encoding), file_paths, self.workers)
+
+    def cache_key(self):
+        return f"{self.name}(encoding={self.encoding})"
+
+    def get_bytes_parser(self):
+        return partial(parse_html_bytes, encoding=self.encoding)
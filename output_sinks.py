@@ -0,0 +1,386 @@
+"""
+**********************************************************************************
+File: output_sinks.py
+
+Description:
+This module implements the output sinks written alongside the Excel file, for the
+tools that read the test results programmatically, and the fan out writing the rows
+of a single parse to all the sinks (the Excel file included) at once. The rows of
+every HTML file are flushed as soon as the file is written, so the outputs can be
+followed while the run is in progress.
+
+Every row contains the columns of the test table followed by the overall result,
+the source file name and the test ID of its HTML file.
+
+Available sinks:
+- csv: Comma separated values, one header line then one line per row.
+- jsonl: JSON Lines, one JSON object per row with the column names as keys.
+- sqlite: SQLite store of the files and steps of all the runs (result_store.py).
+
+Classes:
+- OutputSink: Base class of the output sinks.
+- CsvSink: Writes the rows to a CSV file.
+- JsonLinesSink: Writes the rows to a JSON Lines file.
+- ExcelSink: Adapts an Excel session to the sink interface.
+- ThreadedSink: Runs a sink in its own thread fed from a buffer bounded in calls and in rows.
+- SinkFanOut: Tees the rows into several sinks, each writing in its own thread.
+
+Functions:
+- create_sink: Creates the sink with the given name.
+
+**********************************************************************************
+"""
+
+# Imports
+import csv
+import json
+import os
+import queue
+import threading
+from extraction_backends import get_test_id
+from result_store import ResultStore
+
+# Columns added after the columns of the test table
+sink_columns = ['Overall Result', 'Source File', 'Test ID']
+sink_queue_size = 64   # Maximum number of calls waiting in the buffer of a sink
+sink_buffer_rows = 30000  # Maximum number of rows waiting in the buffer of a sink (about 3 batches of rows)
+end_of_stream = None   # Sentinel put in the buffer of a sink when the run is finished
+
+
+# Classes
+class OutputSink:
+    """
+    Base class of the output sinks. A sink can be used as a context manager.
+
+    The rows of every HTML file are written with start_report, one or more write_rows calls
+    and end_report.
+    """
+    name = None           # Name of the sink in the registry
+    file_extension = None  # Extension of the output file
+
+    def __init__(self, file_name):
+        self.file_name = file_name  # The name or path of the output file
+        self.output_file = open(file_name, 'w', newline='', encoding='utf-8')
+        self.headers = []           # Headers of the test table of the current HTML file
+        self.extra_columns = []     # Overall result, source file and test ID of the current HTML file
+
+    def start_report(self, headers, file_path, overall_result):
+        """
+        Starts writing the rows of an HTML file.
+
+        Args:
+            headers (list): The headers of the test table.
+            file_path (str): The path of the HTML file.
+            overall_result (str): The overall result of the HTML file.
+
+        Returns:
+            None
+        """
+        source_file = os.path.basename(file_path)
+        self.headers = list(headers)
+        self.extra_columns = [overall_result, source_file, get_test_id(source_file)]
+
+    def write_rows(self, rows):
+        """
+        Writes rows of the test table of the current HTML file.
+
+        Args:
+            rows (list): Rows of the test table, each row being a list of cell values.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError
+
+    def end_report(self):
+        """
+        Flushes the rows of the current HTML file to the output file.
+
+        Returns:
+            None
+        """
+        self.output_file.flush()
+
+    def close(self):
+        """
+        Closes the output file.
+
+        Returns:
+            None
+        """
+        if not self.output_file.closed:
+            self.output_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CsvSink(OutputSink):
+    """
+    Writes the rows to a CSV file. The header line is written from the headers of the first HTML file.
+    """
+    name = "csv"
+    file_extension = ".csv"
+
+    def __init__(self, file_name):
+        super().__init__(file_name)
+        self.writer = csv.writer(self.output_file)
+        self.first_report = True  # Flag to write the header line only once
+
+    def start_report(self, headers, file_path, overall_result):
+        super().start_report(headers, file_path, overall_result)
+        if self.first_report:
+            self.writer.writerow(self.headers + sink_columns)
+            self.first_report = False
+
+    def write_rows(self, rows):
+        extra_columns = self.extra_columns
+        self.writer.writerows(list(row) + extra_columns for row in rows)
+
+
+class JsonLinesSink(OutputSink):
+    """
+    Writes every row to a JSON Lines file as an object whose keys are the headers of its HTML file.
+    """
+    name = "jsonl"
+    file_extension = ".jsonl"
+
+    def write_rows(self, rows):
+        columns = self.headers + sink_columns
+        extra_columns = self.extra_columns
+        self.output_file.writelines(json.dumps(dict(zip(columns, list(row) + extra_columns)), ensure_ascii=False) + '\n'
+                                    for row in rows)
+
+
+class ExcelSink:
+    """
+    Adapts an Excel session (ExcelWorkbookSession, WriteOnlyExcelSession or StreamingXlsxWriter) to the
+    sink interface, so the excel file is written by the fan out like the other sinks.
+
+    The header row is written once, from the headers of the first HTML file, and the overall result
+    is only written in the first row of every HTML file. In summary only mode one row is written per
+    HTML file with its name, test ID and overall result. The sessions keeping a sources index
+    (ExcelWorkbookSession) are told which HTML file the rows belong to.
+    """
+    name = "excel"
+
+    def __init__(self, excel_session, overall_result_header, summary_only=False):
+        self.excel_session = excel_session              # The session writing the excel file
+        self.overall_result_header = overall_result_header  # Header of the overall result column
+        self.summary_only = summary_only                # Write one row per HTML file
+        self.first_report = True                        # Flag to write the header row only once
+        self.overall_result = None                      # Overall result not yet written of the current file
+        self.summary_row = None                         # Row of the current file in summary only mode
+        self.tracks_sources = hasattr(excel_session, 'start_source')  # The session keeps a sources index
+
+    def start_report(self, headers, file_path, overall_result):
+        if self.first_report:
+            if self.summary_only:
+                self.excel_session.append_header(['Test File', 'Test ID', self.overall_result_header])
+            else:
+                self.excel_session.append_header(list(headers) + [self.overall_result_header])
+            self.first_report = False
+        self.overall_result = overall_result
+        source_file = os.path.basename(file_path)
+        self.summary_row = [source_file, get_test_id(source_file), overall_result]
+        if self.tracks_sources:
+            self.excel_session.start_source(file_path)
+
+    def write_rows(self, rows):
+        if self.summary_only:
+            return
+        if self.overall_result is not None and rows:
+            # Appending the test result to the first row of the file in the new column (overall results)
+            rows = [list(rows[0]) + [self.overall_result]] + list(rows[1:])
+            self.overall_result = None
+        self.excel_session.append_rows(rows)
+
+    def end_report(self):
+        if self.summary_only:
+            self.excel_session.append_rows([self.summary_row])
+        if self.tracks_sources:
+            self.excel_session.end_source()
+
+    def close(self):
+        self.excel_session.close()
+
+
+class ThreadedSink:
+    """
+    Runs a sink in its own thread, fed from a bounded queue (the buffer of the sink).
+
+    The buffer is bounded in calls (queue_size) and in rows (buffer_rows), so the memory it holds
+    doesn't depend on the size of the row batches. A batch is always accepted by an empty buffer,
+    even if it has more rows than buffer_rows.
+    An error raised by the sink is kept and raised in the producer thread on the next call,
+    the remaining items of the queue are discarded so the producer is never blocked.
+    """
+
+    def __init__(self, sink, queue_size, buffer_rows=sink_buffer_rows):
+        self.sink = sink                                # The wrapped sink
+        self.queue = queue.Queue(maxsize=queue_size)    # Calls waiting to be run by the sink thread
+        self.buffer_rows = buffer_rows                  # Maximum number of rows waiting in the queue
+        self.buffered_rows = 0                          # Rows waiting in the queue
+        self.rows_written = threading.Condition()       # Notified when the sink thread has taken rows off the buffer
+        self.max_depth = 0                              # Maximum number of rows waiting in the queue
+        self.error = None                               # Exception raised by the sink
+        self.thread = threading.Thread(target=self.run, name=f'sink-{sink.name}', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """
+        Runs the queued calls of the sink until the end of the stream.
+
+        Returns:
+            None
+        """
+        while True:
+            item = self.queue.get()
+            if item is end_of_stream:
+                return
+            method_name, args, row_count = item
+            if self.error is None:
+                try:
+                    getattr(self.sink, method_name)(*args)
+                except Exception as e:
+                    self.error = e
+            if row_count:
+                with self.rows_written:
+                    self.buffered_rows -= row_count
+                    self.rows_written.notify()
+
+    def put(self, method_name, *args):
+        """
+        Queues a call of a sink method, blocking only if the buffer of this sink is full (in calls or in rows).
+
+        Args:
+            method_name (str): The name of the sink method.
+            *args: The arguments of the method.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: The error raised by the sink in a previous call.
+        """
+        if self.error is not None:
+            raise self.error
+        row_count = len(args[0]) if method_name == 'write_rows' else 0
+        if row_count:
+            with self.rows_written:
+                while self.buffered_rows and self.buffered_rows + row_count > self.buffer_rows:
+                    self.rows_written.wait()
+                self.buffered_rows += row_count
+                self.max_depth = max(self.max_depth, self.buffered_rows)
+        self.queue.put((method_name, args, row_count))
+
+    def close(self):
+        """
+        Waits until the sink has written all the queued rows and closes it.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: The error raised by the sink, if any.
+        """
+        self.queue.put(end_of_stream)
+        self.thread.join()
+        self.sink.close()
+        if self.error is not None:
+            raise self.error
+
+
+class SinkFanOut:
+    """
+    Tees the rows of every HTML file into several sinks. Every sink writes in its own thread from its
+    own buffer, so a slow sink (for example the styled excel file) doesn't stall the faster ones until
+    its buffer is full. All the sinks receive the same row batches in the same order.
+    It can be used as a context manager.
+    """
+
+    def __init__(self, sinks, queue_size=sink_queue_size, buffer_rows=sink_buffer_rows):
+        self.threaded_sinks = [ThreadedSink(sink, queue_size, buffer_rows) for sink in sinks]
+
+    def start_report(self, headers, file_path, overall_result):
+        """
+        Starts writing the rows of an HTML file to all the sinks. See OutputSink.start_report.
+        """
+        for threaded_sink in self.threaded_sinks:
+            threaded_sink.put('start_report', headers, file_path, overall_result)
+
+    def write_rows(self, rows):
+        """
+        Writes a batch of rows to all the sinks. The batch is shared by the sinks and must not be modified.
+        """
+        for threaded_sink in self.threaded_sinks:
+            threaded_sink.put('write_rows', rows)
+
+    def end_report(self):
+        """
+        Ends the rows of the current HTML file in all the sinks.
+        """
+        for threaded_sink in self.threaded_sinks:
+            threaded_sink.put('end_report')
+
+    def max_depths(self):
+        """
+        Returns the maximum number of rows that waited in the buffer of every sink.
+
+        Returns:
+            dict: Sink name -> maximum buffer depth (rows).
+        """
+        return {threaded_sink.sink.name: threaded_sink.max_depth for threaded_sink in self.threaded_sinks}
+
+    def close(self):
+        """
+        Waits until all the sinks have written their rows and closes them.
+
+        Returns:
+            None
+
+        Raises:
+            Exception: The first error raised by a sink, if any.
+        """
+        errors = []
+        for threaded_sink in self.threaded_sinks:
+            try:
+                threaded_sink.close()
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Registry of the output sinks: name -> class
+output_sinks = {sink.name: sink for sink in (CsvSink, JsonLinesSink, ResultStore)}
+
+
+# Functions
+def create_sink(sink_name, output_base_name):
+    """
+    Creates an output sink writing to the base name with the extension of the sink.
+
+    Args:
+        sink_name (str): The name of the sink (csv, jsonl or sqlite).
+        output_base_name (str): The output file name without extension (for example Tests_Results).
+
+    Returns:
+        OutputSink: The created sink.
+
+    Raises:
+        ValueError: If no sink is registered with the given name.
+    """
+    if sink_name not in output_sinks:
+        raise ValueError(f"Unknown output sink: {sink_name}")
+    sink_class = output_sinks[sink_name]
+    return sink_class(os.path.splitext(output_base_name)[0] + sink_class.file_extension)
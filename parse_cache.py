@@ -0,0 +1,283 @@
+"""
+**********************************************************************************
+File: parse_cache.py
+
+Description:
+This module implements a persistent parse cache of the HTML reports, so the
+unchanged reports of a folder are not parsed again on every run.
+
+The cache is a local SQLite file with one entry per report and extraction backend
+(the backend name and the options changing its reports, see
+ExtractionBackend.cache_key).
+An entry holds the size, modification time and content hash (BLAKE2b) of the file
+when it was parsed, and its report (headers, rows, overall result) as zlib
+compressed JSON. A report is served from the cache when the size and modification
+time of the file are unchanged, or when only the modification time changed but the
+content hash is the same. The cache size is bounded: when it is closed, the least
+recently used entries are evicted until the entries fit in max_bytes.
+
+The streamed reports (larger than the stream threshold) and the failed reports are
+never cached.
+
+Classes:
+- ParseCache: Persistent cache of the extracted reports.
+
+Functions:
+- hash_file_content: Returns the BLAKE2b hash of the content of a file.
+- encode_report: Serializes a report to compressed JSON.
+- decode_report: Deserializes a report from compressed JSON.
+
+**********************************************************************************
+"""
+
+# Imports
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from extraction_backends import ReportTable, failed_extraction
+
+# Schema of the cache, used_at orders the entries for the least recently used eviction
+cache_schema = """
+CREATE TABLE IF NOT EXISTS reports (
+    path TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (path, backend)
+);
+CREATE INDEX IF NOT EXISTS reports_used_at ON reports (used_at);
+"""
+default_max_bytes = 256 * 1024 * 1024   # Default maximum size of the cached payloads
+entries_per_transaction = 1000          # Number of stored or used entries committed in a single transaction
+hash_chunk_size = 1 << 20               # Size of the chunks read to hash a file
+cached_by = "cache"                     # extracted_by of the reports served from the cache
+
+
+# Functions
+def hash_file_content(file_path):
+    """
+    Returns the BLAKE2b hash of the content of a file, read in chunks.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        str: The hexadecimal hash (16 bytes digest).
+    """
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as input_file:
+        for chunk in iter(lambda: input_file.read(hash_chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def encode_report(report):
+    """
+    Serializes a report (with materialized rows) to zlib compressed JSON.
+
+    Args:
+        report (ReportTable): The report.
+
+    Returns:
+        bytes: The compressed report.
+    """
+    data = [list(report.headers), [list(row) for row in report.rows], list(report.overall_result), report.extracted_by]
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_report(payload):
+    """
+    Deserializes a report from zlib compressed JSON.
+
+    Args:
+        payload (bytes): The compressed report.
+
+    Returns:
+        ReportTable: The report, extracted_by is set to "cache".
+    """
+    headers, rows, overall_result, _ = json.loads(zlib.decompress(payload).decode('utf-8'))
+    return ReportTable(headers, rows, overall_result, cached_by)
+
+
+# Classes
+class ParseCache:
+    """
+    Persistent cache of the reports extracted by a backend. It can be used as a context manager.
+
+    lookup returns the compressed cached report of a file (or None), put stores the report of a parsed
+    file, and extract_many combines both to only parse the files missing from the cache. The cached
+    reports are kept compressed until they are written.
+    The numbers of hits and misses of the run are kept in hits and misses.
+    """
+
+    def __init__(self, file_name, backend_key, max_bytes=default_max_bytes):
+        self.file_name = file_name          # The path of the SQLite cache file
+        self.backend_key = backend_key      # The extraction backend and options of the cached reports (cache_key)
+        self.max_bytes = max_bytes          # Maximum size of the cached payloads, larger ones are evicted on close
+        self.connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(cache_schema)
+        self.hits = 0                       # Reports served from the cache
+        self.misses = 0                     # Reports missing from the cache or changed
+        self.used_entries = []              # (used_at, path, backend) of the hits not yet recorded
+        self.uncommitted_entries = 0        # Entries stored or used since the last commit
+
+    def lookup(self, file_path):
+        """
+        Returns the compressed cached report of a file if the file didn't change since it was parsed.
+
+        Args:
+            file_path (str): The path of the HTML file.
+
+        Returns:
+            bytes: The compressed report (see decode_report), or None on a cache miss.
+        """
+        path = os.path.abspath(file_path)
+        entry = self.connection.execute("SELECT size, mtime_ns, content_hash, payload FROM reports "
+                                        "WHERE path = ? AND backend = ?", (path, self.backend_key)).fetchone()
+        if entry is None:
+            self.misses += 1
+            return None
+        size, mtime_ns, content_hash, payload = entry
+        file_stat = os.stat(file_path)
+        if file_stat.st_size != size:
+            self.misses += 1
+            return None
+        if file_stat.st_mtime_ns != mtime_ns:
+            # Only the modification time changed (copied or touched file), the content decides
+            if hash_file_content(file_path) != content_hash:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE reports SET mtime_ns = ? WHERE path = ? AND backend = ?",
+                                    (file_stat.st_mtime_ns, path, self.backend_key))
+        self.hits += 1
+        self.used_entries.append((time.time(), path, self.backend_key))
+        self.count_entry()
+        return payload
+
+    def put(self, file_path, report):
+        """
+        Stores the report of a parsed file. The streamed and failed reports are returned without being stored.
+
+        Args:
+            file_path (str): The path of the HTML file.
+            report (ReportTable): The report of the file.
+
+        Returns:
+            ReportTable: The report, with its rows materialized as a list when it is stored.
+        """
+        if report.extracted_by in ("streamed", failed_extraction):
+            return report
+        report = report._replace(rows=[list(row) for row in report.rows])
+        file_stat = os.stat(file_path)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO reports (path, backend, size, mtime_ns, content_hash, used_at, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(file_path), self.backend_key, file_stat.st_size, file_stat.st_mtime_ns,
+             hash_file_content(file_path), time.time(), encode_report(report)))
+        self.count_entry()
+        return report
+
+    def lookup_many(self, file_paths):
+        """
+        Returns the compressed cached reports of several files.
+
+        Args:
+            file_paths (list): The paths of the HTML files.
+
+        Returns:
+            list: The compressed cached report of every file, None for the cache misses.
+        """
+        return [self.lookup(file_path) for file_path in file_paths]
+
+    def extract_many(self, extract_many, file_paths):
+        """
+        Yields the reports of the files in order, only the cache misses are extracted (and stored).
+
+        Args:
+            extract_many (callable): Function extracting a list of files, like ExtractionBackend.extract_many.
+            file_paths (list): The paths of the HTML files.
+
+        Yields:
+            ReportTable: The report of every file, in the order of file_paths.
+        """
+        cached_reports = self.lookup_many(file_paths)
+        missed_files = [file_path for file_path, payload in zip(file_paths, cached_reports) if payload is None]
+        extracted_reports = iter(extract_many(missed_files)) if missed_files else iter(())
+        for file_path, payload in zip(file_paths, cached_reports):
+            if payload is None:
+                yield self.put(file_path, next(extracted_reports))
+            else:
+                yield decode_report(payload)
+
+    def count_entry(self):
+        """
+        Counts a stored or used entry, committing the transaction every entries_per_transaction entries.
+
+        Returns:
+            None
+        """
+        self.uncommitted_entries += 1
+        if self.uncommitted_entries >= entries_per_transaction:
+            self.commit()
+
+    def commit(self):
+        """
+        Records the use time of the hits and commits the transaction.
+
+        Returns:
+            None
+        """
+        with self.connection:
+            self.connection.executemany("UPDATE reports SET used_at = ? WHERE path = ? AND backend = ?",
+                                        self.used_entries)
+        self.used_entries = []
+        self.uncommitted_entries = 0
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cached payloads fit in max_bytes.
+
+        Returns:
+            int: The number of evicted entries.
+        """
+        total_bytes = self.connection.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM reports").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return 0
+        evicted_entries = []
+        for path, backend, payload_size in self.connection.execute(
+                "SELECT path, backend, LENGTH(payload) FROM reports ORDER BY used_at"):
+            if total_bytes <= self.max_bytes:
+                break
+            evicted_entries.append((path, backend))
+            total_bytes -= payload_size
+        with self.connection:
+            self.connection.executemany("DELETE FROM reports WHERE path = ? AND backend = ?", evicted_entries)
+        return len(evicted_entries)
+
+    def close(self):
+        """
+        Commits the pending entries, evicts the least recently used entries and closes the cache.
+
+        Returns:
+            None
+        """
+        if self.connection is None:
+            return
+        self.commit()
+        self.evict()
+        self.connection.close()
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,186 @@
+"""
+**********************************************************************************
+File: report_discovery.py
+
+Description:
+This module implements the discovery stage checks, run on the HTML files before
+any report is parsed.
+
+The pre-flight check rejects the files that can't contain a test table (empty files,
+files not starting like an HTML document, files without any <table tag) from their
+size and a few reads, so they are listed as skipped with the reason instead of
+failing in the extraction backend (a browser navigation for selenium).
+
+The duplicate detection finds the HTML reports with the same content (copies such
+as "ATS-32045 - Copy.html", or reports uploaded again under another name).
+
+Only the files having the same size as another file can be duplicates, so the files
+are first grouped by size and only the files of the groups with several files are
+hashed (BLAKE2b, read in chunks). The file with the shortest name of every group of
+identical files (the lexicographically first name among the shortest ones) is the
+original, whatever the order of the file list, so "ATS-32045.html" is kept rather
+than "ATS-32045 - Copy.html". The other files are its duplicates.
+
+When a run only processes a part of the directory (append and resume modes), the files
+to process are also compared with the files already written by the previous run, so a
+new copy of a written report is found as its duplicate.
+
+Duplicate policies:
+- keep: No detection, every file is parsed and written.
+- skip: The duplicates are not parsed nor written.
+- alias: The duplicates are not parsed, the report of their original is written under their name.
+
+Functions:
+- check_report_file: Returns the reason why a file is rejected by the pre-flight check, if any.
+- preflight_reports: Splits the files into the accepted files and the rejected files with their reason.
+- original_file_key: Returns the sort key choosing the original of a group of identical files.
+- find_duplicate_reports: Returns the original files and their duplicates.
+- find_written_duplicates: Returns the files identical to a file already written by a previous run.
+
+**********************************************************************************
+"""
+
+# Imports
+from collections import defaultdict
+import os
+from parse_cache import hash_file_content
+
+duplicate_policies = ("keep", "skip", "alias")  # Available duplicate policies
+magic_bytes_size = 1024         # Number of bytes read at the start of a file for the magic byte check
+probe_chunk_size = 1 << 16      # Size of the chunks read when probing a file for a table
+utf8_bom = b'\xef\xbb\xbf'
+table_tag = b'<table'
+
+
+# Functions
+def check_report_file(file_path):
+    """
+    Checks that a file can contain a test table without parsing it: the file is not empty, its first
+    character (after a UTF-8 byte order mark and white spaces) starts a tag, and it contains a <table tag.
+
+    Args:
+        file_path (str): The path of the HTML file.
+
+    Returns:
+        str: The reason why the file is rejected, or None if the file is accepted.
+    """
+    file_size = os.path.getsize(file_path)
+    if file_size == 0:
+        return "empty file"
+    with open(file_path, 'rb') as report_file:
+        head = report_file.read(magic_bytes_size)
+        content = head[len(utf8_bom):] if head.startswith(utf8_bom) else head
+        content = content.lstrip()
+        if not content and file_size <= magic_bytes_size:
+            return "empty file (white spaces only)"
+        if content and not content.startswith(b'<'):
+            return "not an HTML file"
+        # Probing for the table in chunks, keeping the end of the previous chunk for a tag split between two chunks
+        data = head.lower()
+        while table_tag not in data:
+            chunk = report_file.read(probe_chunk_size)
+            if not chunk:
+                return "no <table> in the file"
+            data = data[-len(table_tag):] + chunk.lower()
+    return None
+
+
+def preflight_reports(file_paths):
+    """
+    Runs the pre-flight check on the HTML files.
+
+    Args:
+        file_paths (list): The paths of the HTML files.
+
+    Returns:
+        tuple: (list of the paths of the accepted files, list of (path, reason) of the rejected files).
+    """
+    accepted_files = []
+    rejected_files = []
+    for file_path in file_paths:
+        reason = check_report_file(file_path)
+        if reason is None:
+            accepted_files.append(file_path)
+        else:
+            rejected_files.append((file_path, reason))
+    return accepted_files, rejected_files
+
+
+def original_file_key(file_path):
+    """
+    Returns the sort key choosing the original of a group of identical files: the shortest file name first,
+    then the lexicographically first name.
+
+    Args:
+        file_path (str): The path of the HTML file.
+
+    Returns:
+        tuple: (length of the file name, file name, path).
+    """
+    file_name = os.path.basename(file_path)
+    return len(file_name), file_name, file_path
+
+
+def find_duplicate_reports(file_paths):
+    """
+    Finds the files with the same content. Only the files having the same size as another file are hashed.
+
+    Args:
+        file_paths (list): The paths of the HTML files.
+
+    Returns:
+        tuple: (list of the paths of the original files in the order of file_paths,
+                dict of original path -> list of the paths of its duplicates, in the order of original_file_key).
+    """
+    files_by_size = defaultdict(list)
+    for file_path in file_paths:
+        files_by_size[os.path.getsize(file_path)].append(file_path)
+    duplicate_of = {}   # Duplicate path -> original path
+    duplicates = {}     # Original path -> duplicate paths
+    for same_size_files in files_by_size.values():
+        if len(same_size_files) < 2:
+            continue
+        files_by_hash = defaultdict(list)
+        for file_path in same_size_files:
+            files_by_hash[hash_file_content(file_path)].append(file_path)
+        for identical_files in files_by_hash.values():
+            if len(identical_files) < 2:
+                continue
+            original_path, *duplicate_paths = sorted(identical_files, key=original_file_key)
+            duplicates[original_path] = duplicate_paths
+            for duplicate_path in duplicate_paths:
+                duplicate_of[duplicate_path] = original_path
+    original_files = [file_path for file_path in file_paths if file_path not in duplicate_of]
+    return original_files, duplicates
+
+
+def find_written_duplicates(file_paths, written_paths):
+    """
+    Finds the files with the same content as a file already written by a previous run. Only the files
+    having the same size as a written file are hashed.
+
+    Args:
+        file_paths (list): The paths of the HTML files to process.
+        written_paths (list): The paths of the HTML files already written.
+
+    Returns:
+        dict: Path of a file to process -> path of the written file with the same content (the first one
+        in the order of original_file_key).
+    """
+    written_by_size = defaultdict(list)
+    for written_path in written_paths:
+        written_by_size[os.path.getsize(written_path)].append(written_path)
+    written_hashes = {}  # File size -> {content hash: first written path}, hashed when a file has this size
+    written_duplicates = {}
+    for file_path in file_paths:
+        file_size = os.path.getsize(file_path)
+        if file_size not in written_by_size:
+            continue
+        if file_size not in written_hashes:
+            same_size_hashes = written_hashes[file_size] = {}
+            for written_path in sorted(written_by_size[file_size], key=original_file_key):
+                same_size_hashes.setdefault(hash_file_content(written_path), written_path)
+        written_path = written_hashes[file_size].get(hash_file_content(file_path))
+        if written_path is not None:
+            written_duplicates[file_path] = written_path
+    return written_duplicates
@@ -0,0 +1,267 @@
+"""
+**********************************************************************************
+File: result_store.py
+
+Description:
+This module implements a local SQLite store of the extracted test results, so the
+results of all the runs can be queried (for example all the FAILED test IDs of a
+run, or the files containing a test step) without opening the Excel files.
+
+The store is written as an output sink (see output_sinks.py): the files and the
+steps of every run are inserted with batched executemany calls, each batch in a
+single transaction. The store file is kept between the runs, every run adds a row
+to the runs table.
+
+Tables:
+- runs: One row per run (start and end time, directory, number of files).
+- files: One row per HTML file of a run (file name, ATS test ID, path, size, mtime, SHA-256, verdict).
+- steps: One row per test step (step text, step result and all the cells as JSON).
+
+Classes:
+- ResultStore: Output sink writing the results of a run to the SQLite store.
+
+Functions:
+- get_verdict: Returns the verdict (PASSED / FAILED) of an overall result.
+- hash_file: Returns the SHA-256 of a file.
+- query_failed_test_ids: Returns the test IDs of the FAILED files of a run.
+- query_files_with_step: Returns the files containing a test step.
+
+**********************************************************************************
+"""
+
+# Imports
+from datetime import datetime
+import hashlib
+import json
+import os
+import sqlite3
+from extraction_backends import get_test_id
+
+# Schema of the store, the indexes serve the lookups by run / verdict, test ID, file name and step
+store_schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    directory TEXT,
+    file_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    file_name TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    sha256 TEXT,
+    overall_result TEXT,
+    verdict TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    step_id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(file_id),
+    step_index INTEGER NOT NULL,
+    test_step TEXT,
+    step_result TEXT,
+    cells TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_run_verdict ON files (run_id, verdict);
+CREATE INDEX IF NOT EXISTS files_test_id ON files (test_id);
+CREATE INDEX IF NOT EXISTS files_file_name ON files (file_name);
+CREATE INDEX IF NOT EXISTS steps_test_step ON steps (test_step);
+CREATE INDEX IF NOT EXISTS steps_file_id ON steps (file_id);
+"""
+rows_per_transaction = 10000    # Number of files and steps inserted in a single transaction
+hash_chunk_size = 1 << 20       # Size of the chunks read to hash a file
+test_step_header = 'Test Step'      # Header of the step column stored in test_step
+step_result_header = 'Step Result'  # Header of the step result column stored in step_result
+
+
+# Functions
+def get_verdict(overall_result):
+    """
+    Returns the verdict of an overall result, for example FAILED for "Test Result : FAILED".
+
+    Args:
+        overall_result (str): The overall result text.
+
+    Returns:
+        str: The text after the last colon, in upper case.
+    """
+    return str(overall_result).rsplit(':', 1)[-1].strip().upper()
+
+
+def hash_file(file_path):
+    """
+    Returns the SHA-256 of a file, read in chunks.
+
+    Args:
+        file_path (str): The path of the file.
+
+    Returns:
+        str: The hexadecimal SHA-256 of the file.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as input_file:
+        for chunk in iter(lambda: input_file.read(hash_chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def query_failed_test_ids(connection, run_id):
+    """
+    Returns the test IDs of the FAILED files of a run.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the store.
+        run_id (int): The ID of the run.
+
+    Returns:
+        list: The sorted test IDs.
+    """
+    rows = connection.execute("SELECT DISTINCT test_id FROM files WHERE run_id = ? AND verdict = 'FAILED' "
+                              "ORDER BY test_id", (run_id,))
+    return [row[0] for row in rows]
+
+
+def query_files_with_step(connection, test_step, run_id=None):
+    """
+    Returns the files containing a test step.
+
+    Args:
+        connection (sqlite3.Connection): The connection to the store.
+        test_step (str): The text of the test step.
+        run_id (int, optional): Only return the files of this run.
+
+    Returns:
+        list: Tuples of (run ID, file name, test ID).
+    """
+    query = ("SELECT DISTINCT files.run_id, files.file_name, files.test_id FROM steps "
+             "JOIN files ON files.file_id = steps.file_id WHERE steps.test_step = ?")
+    parameters = [test_step]
+    if run_id is not None:
+        query += " AND files.run_id = ?"
+        parameters.append(run_id)
+    return list(connection.execute(query + " ORDER BY files.run_id, files.file_name", parameters))
+
+
+# Classes
+class ResultStore:
+    """
+    Output sink writing the files and steps of a run to the SQLite store.
+
+    The file row is buffered when the file starts (its size, mtime and hash are read at that time),
+    its steps reference its index in the buffered files until it is inserted. The file IDs are allocated
+    when the files are inserted, inside the write transaction (BEGIN IMMEDIATE), so several processes can
+    write to the same store. The files and the steps are inserted with executemany in the same
+    transaction, committed every rows_per_transaction files and steps.
+    """
+    name = "sqlite"
+    file_extension = ".db"
+
+    def __init__(self, file_name):
+        self.file_name = file_name      # The path of the SQLite store
+        self.connection = sqlite3.connect(file_name, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(store_schema)
+        started_at = datetime.now().isoformat(timespec='seconds')
+        with self.connection:
+            self.run_id = self.connection.execute("INSERT INTO runs (started_at) VALUES (?)", (started_at,)).lastrowid
+        self.file_count = 0             # Number of files written in the run
+        self.directory = None           # Directory of the files of the run
+        self.file_id = None             # ID of the current file, once inserted
+        self.file_index = None          # Index of the current file in pending_files, until inserted
+        self.headers = []               # Headers of the test table of the current file
+        self.step_index = 0             # Index of the next step of the current file
+        self.pending_files = []         # Files not yet inserted
+        self.pending_steps = []         # Steps not yet inserted
+        self.uncommitted_rows = 0       # Files and steps inserted or buffered since the last commit
+
+    def start_report(self, headers, file_path, overall_result):
+        if self.directory is None:
+            self.directory = os.path.dirname(os.path.abspath(file_path))
+        file_name = os.path.basename(file_path)
+        file_stat = os.stat(file_path)
+        self.file_id = None
+        self.file_index = len(self.pending_files)
+        self.pending_files.append((
+            self.run_id, file_name, get_test_id(file_name), os.path.abspath(file_path),
+            file_stat.st_size, file_stat.st_mtime, hash_file(file_path), overall_result, get_verdict(overall_result)))
+        self.headers = list(headers)
+        self.step_index = 0
+        self.file_count += 1
+        self.uncommitted_rows += 1
+
+    def write_rows(self, rows):
+        headers = self.headers
+        test_step_column = headers.index(test_step_header) if test_step_header in headers else 0
+        step_result_column = headers.index(step_result_header) if step_result_header in headers else None
+        for row in rows:
+            if not row:
+                continue
+            self.pending_steps.append((
+                self.file_id, self.file_index, self.step_index, row[test_step_column],
+                row[step_result_column] if step_result_column is not None else None,
+                json.dumps(dict(zip(headers, row)), ensure_ascii=False)))
+            self.step_index += 1
+            self.uncommitted_rows += 1
+        if self.uncommitted_rows >= rows_per_transaction:
+            self.flush()
+
+    def flush(self):
+        """
+        Inserts the buffered files and steps in a single transaction. The IDs of the files are allocated
+        after the files of the store in the transaction, which holds the write lock from its start.
+
+        Returns:
+            None
+        """
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            first_file_id = self.connection.execute("SELECT COALESCE(MAX(file_id), 0) + 1 FROM files").fetchone()[0]
+            self.connection.executemany(
+                "INSERT INTO files (file_id, run_id, file_name, test_id, path, size, mtime, sha256, overall_result, "
+                "verdict) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((first_file_id + file_index, *file_row) for file_index, file_row in enumerate(self.pending_files)))
+            # The steps of the buffered files get the ID of their file
+            self.connection.executemany(
+                "INSERT INTO steps (file_id, step_index, test_step, step_result, cells) VALUES (?, ?, ?, ?, ?)",
+                ((file_id if file_index is None else first_file_id + file_index, *step_row)
+                 for file_id, file_index, *step_row in self.pending_steps))
+        if self.file_index is not None:
+            # The next steps of the current file reference its ID
+            self.file_id = first_file_id + self.file_index
+            self.file_index = None
+        self.pending_files = []
+        self.pending_steps = []
+        self.uncommitted_rows = 0
+
+    def end_report(self):
+        # The files are committed in batches too, a file without steps (summary only mode) only counts as one row
+        if self.uncommitted_rows >= rows_per_transaction:
+            self.flush()
+
+    def close(self):
+        """
+        Inserts the remaining files and steps, records the end of the run and closes the store.
+
+        Returns:
+            None
+        """
+        if self.connection is None:
+            return
+        self.flush()
+        finished_at = datetime.now().isoformat(timespec='seconds')
+        with self.connection:
+            self.connection.execute("UPDATE runs SET finished_at = ?, directory = ?, file_count = ? WHERE run_id = ?",
+                                    (finished_at, self.directory, self.file_count, self.run_id))
+        self.connection.close()
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,120 @@
+"""
+**********************************************************************************
+File: run_context.py
+
+Description:
+This module implements the context of a run: the HTML directory and files to
+process, the output paths, the run options and the progress counters. Every run
+owns its context, so several runs (for example of the directories of several test
+rigs) can be processed at the same time from one GUI or one process.
+
+The output files of a run (Excel file, journal, sinks, parse cache) are written
+to the HTML directory of the run, so every directory always has its outputs in
+the same place whether it is processed alone or with other directories, and the
+outputs of two runs never overwrite each other.
+
+Classes:
+- RunContext: Holds the inputs, outputs, options and progress of a run.
+
+**********************************************************************************
+"""
+
+# Imports
+import os
+
+test_results_excel_file = "Tests_Results.xlsx"  # Output excel file name
+test_summary_excel_file = "Tests_Summary.xlsx"  # Output excel file name of the summary only mode
+parse_cache_file = "Parse_Cache.db"             # Persistent parse cache of the reports (see parse_cache.py)
+default_parse_cache_max_size = 256 * 1024 * 1024  # Maximum size (bytes) of the cached reports
+default_checkpoint_rows = 10000  # Rows written before the first save of the excel file in the GUI (resumable runs)
+default_checkpoint_growth = 2    # Factor of the rows between two saves after every save in the GUI (linear total cost)
+
+
+# Classes
+class RunContext:
+    """
+    Holds the inputs (HTML directory and files), the output paths, the options and the progress
+    counters of a run. The extraction backend (parser or browser) of the run is kept in backend
+    while the files are processed.
+    """
+
+    def __init__(self, directory, file_names=None, output_directory=None, summary_only=False, checkpoint_rows=None,
+                 checkpoint_growth=1, parse_cache_max_size=default_parse_cache_max_size):
+        self.directory = directory  # The directory of the HTML files
+        if file_names is None:
+            file_names = [file for file in os.listdir(directory) if file.endswith('html')]
+        self.file_names = list(file_names)  # The names of the HTML files of the directory
+        self.output_directory = output_directory or directory  # The directory of the output files (the HTML directory)
+        self.summary_only = summary_only  # Only the overall result of every file is written
+        self.checkpoint_rows = checkpoint_rows  # Rows written between two saves of the excel file (None: at the end)
+        self.checkpoint_growth = checkpoint_growth  # Factor of checkpoint_rows after every save (1: fixed interval)
+        self.parse_cache_max_size = parse_cache_max_size  # Maximum size (bytes) of the parse cache
+        self.backend = None  # The extraction backend of the run, while the files are processed
+        self.progress_counter = 0  # The current progress (percent)
+        self.progress_step = 100 / max(len(self.file_names), 1)  # The progress of every written file
+
+    @property
+    def number_of_files(self):
+        """
+        int: The number of HTML files of the directory.
+        """
+        return len(self.file_names)
+
+    @property
+    def output_excel_file(self):
+        """
+        str: The path of the output excel file (the summary file in summary only mode).
+        """
+        excel_file_name = test_summary_excel_file if self.summary_only else test_results_excel_file
+        return self.output_path(excel_file_name)
+
+    @property
+    def parse_cache_file(self):
+        """
+        str: The path of the parse cache of the run.
+        """
+        return self.output_path(parse_cache_file)
+
+    def output_path(self, file_name):
+        """
+        Returns the path of an output file in the output directory of the run.
+
+        Args:
+            file_name (str): The name of the output file.
+
+        Returns:
+            str: The path of the output file.
+        """
+        return os.path.join(self.output_directory, file_name)
+
+    def file_paths(self):
+        """
+        Returns the paths of the HTML files of the run.
+
+        Returns:
+            list: The paths of the HTML files.
+        """
+        return [os.path.join(self.directory, file) for file in self.file_names]
+
+    def start_progress(self, written_files):
+        """
+        Resets the progress counter for the number of files that will be written.
+
+        Args:
+            written_files (int): The number of files that will be written.
+
+        Returns:
+            None
+        """
+        self.progress_counter = 0
+        self.progress_step = 100 / max(written_files, 1)
+
+    def advance_progress(self):
+        """
+        Advances the progress by one written file.
+
+        Returns:
+            int: The current progress (percent).
+        """
+        self.progress_counter += self.progress_step
+        return int(self.progress_counter)
@@ -0,0 +1,186 @@
+"""
+**********************************************************************************
+File: run_journal.py
+
+Description:
+This module implements the journal of a run, used to resume an interrupted run
+(crashed browser, error in a report, reboot) from its last durable checkpoint
+instead of processing all the files again.
+
+The journal is an append only JSON Lines file next to the output Excel file. It
+records the start of the run, every completed HTML file with the row range it
+wrote, and a checkpoint every time the Excel file is saved. The file records are
+flushed to disk in batches, the checkpoints immediately. The files recorded before
+the last checkpoint are durable: their rows are in the saved Excel file, the files
+recorded after it are processed again when the run is resumed.
+
+Journal records:
+- {"event": "start", ...}: Start of the run (directory, output file, started_at).
+- {"event": "file", "file": ..., "first_row": ..., "row_count": ...}: Completed HTML file.
+- {"event": "checkpoint", "rows": ...}: The Excel file was saved with this number of rows.
+- {"event": "resume", ...}: The run was resumed.
+- {"event": "finished", ...}: The run completed.
+
+Classes:
+- JournalState: Named tuple holding the state of a run read from its journal.
+- RunJournal: Appends the records of a run to its journal.
+
+Functions:
+- read_journal: Reads the journal of a run and returns its durable state.
+
+**********************************************************************************
+"""
+
+# Imports
+from collections import namedtuple
+from datetime import datetime
+import json
+import os
+
+journal_extension = ".journal"  # Extension of the journal, next to the output Excel file
+files_per_sync = 100            # Number of file records written to the journal between two flushes to disk
+
+# State of a run: its start record, the durable completed files (file name -> (first row, row count)),
+# the number of rows of the last saved Excel file and whether the run completed
+JournalState = namedtuple('JournalState', ['run_info', 'completed_files', 'durable_rows', 'finished'])
+
+
+# Functions
+def read_journal(journal_file_name):
+    """
+    Reads the journal of a run. Only the files recorded before the last checkpoint are returned,
+    a truncated last record (written during a crash) is ignored.
+
+    Args:
+        journal_file_name (str): The path of the journal.
+
+    Returns:
+        JournalState: The durable state of the run, or None if there is no journal.
+    """
+    if not os.path.exists(journal_file_name):
+        return None
+    run_info = None
+    completed_files = {}    # Durable files, up to the last checkpoint
+    pending_files = {}      # Files recorded since the last checkpoint
+    durable_rows = 0
+    finished = False
+    with open(journal_file_name, encoding='utf-8') as journal_file:
+        for line in journal_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            event = record.get('event')
+            if event == 'start':
+                run_info = record
+            elif event == 'file':
+                pending_files[record['file']] = (record['first_row'], record['row_count'])
+            elif event == 'checkpoint':
+                completed_files.update(pending_files)
+                pending_files = {}
+                durable_rows = record['rows']
+            elif event == 'finished':
+                finished = True
+    if run_info is None:
+        return None
+    return JournalState(run_info, completed_files, durable_rows, finished)
+
+
+# Classes
+class RunJournal:
+    """
+    Appends the records of a run to its journal. It can be used as a context manager.
+
+    The file records are written in batches of files_per_sync records, flushed and synced to disk
+    together. A checkpoint record is synced to disk as soon as it is written.
+    """
+
+    def __init__(self, journal_file_name):
+        self.journal_file_name = journal_file_name  # The path of the journal
+        self.journal_file = open(journal_file_name, 'a', encoding='utf-8')
+        self.unsynced_files = 0                     # File records written since the last sync
+
+    def write_record(self, event, **fields):
+        """
+        Writes a record to the journal (buffered).
+
+        Args:
+            event (str): The event of the record.
+            **fields: The fields of the record.
+
+        Returns:
+            None
+        """
+        self.journal_file.write(json.dumps({'event': event, **fields}, ensure_ascii=False) + '\n')
+
+    def sync(self):
+        """
+        Flushes the journal and syncs it to disk.
+
+        Returns:
+            None
+        """
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+        self.unsynced_files = 0
+
+    def record_event(self, event, **fields):
+        """
+        Records an event of the run (start, resume, finished) with its time and syncs the journal.
+
+        Args:
+            event (str): The event.
+            **fields: The other fields of the record.
+
+        Returns:
+            None
+        """
+        self.write_record(event, time=datetime.now().isoformat(timespec='seconds'), **fields)
+        self.sync()
+
+    def record_file(self, file, first_row, row_count):
+        """
+        Records a completed HTML file and the rows it wrote, syncing the journal every files_per_sync files.
+
+        Args:
+            file (str): The name of the HTML file.
+            first_row (int): The first row of the file in the Excel sheet.
+            row_count (int): The number of rows of the file.
+
+        Returns:
+            None
+        """
+        self.write_record('file', file=file, first_row=first_row, row_count=row_count)
+        self.unsynced_files += 1
+        if self.unsynced_files >= files_per_sync:
+            self.sync()
+
+    def record_checkpoint(self, rows):
+        """
+        Records that the Excel file was saved and syncs the journal, making the recorded files durable.
+
+        Args:
+            rows (int): The number of rows of the saved Excel sheet.
+
+        Returns:
+            None
+        """
+        self.write_record('checkpoint', rows=rows)
+        self.sync()
+
+    def close(self):
+        """
+        Syncs and closes the journal.
+
+        Returns:
+            None
+        """
+        if not self.journal_file.closed:
+            self.sync()
+            self.journal_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
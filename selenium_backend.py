@@ -0,0 +1,169 @@
+"""
+**********************************************************************************
+File: selenium_backend.py
+
+Description:
+This module implements the extraction backend that renders every HTML file in a
+headless Google Chrome WebDriver and reads the test table from the rendered page.
+selenium is only imported when this backend is selected.
+
+Extraction modes:
+- script (default): The whole table (headers, rows and the colspan result row) is read
+  with a single execute_script call per file.
+- elements: The table is read with find_elements and one .text call per cell, which costs
+  a WebDriver round trip per cell.
+
+Parallel processing:
+When the backend is created with workers > 1, extract_many() renders the files with a
+pool of headless Chrome instances (one per worker thread) fed from a shared work queue.
+The reports are returned in the order of the files.
+
+Classes:
+- SeleniumBackend: Extraction backend using the Chrome WebDriver.
+
+**********************************************************************************
+"""
+
+# Imports
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from extraction_backends import ExtractionBackend, ReportTable, extract_in_order, extract_safely
+
+# JavaScript returning the headers and the rows of the first table of the page in one round trip.
+# The cell texts are read with innerText, like the .text property of a WebElement.
+extract_table_script = """
+var table = document.getElementsByTagName('table')[0];
+if (!table) {
+    return null;
+}
+var cellText = function (cell) { return cell.innerText.trim(); };
+var headers = Array.prototype.map.call(table.getElementsByTagName('th'), cellText);
+var rows = [];
+var tableRows = table.getElementsByTagName('tr');
+for (var i = 0; i < tableRows.length; i++) {
+    var cells = Array.prototype.map.call(tableRows[i].getElementsByTagName('td'), cellText);
+    if (cells.length) {
+        rows.push(cells);
+    }
+}
+return {headers: headers, rows: rows};
+"""
+selenium_modes = ("script", "elements")  # Available extraction modes of the selenium backend
+
+
+# Classes
+class SeleniumBackend(ExtractionBackend):
+    """
+    Extraction backend rendering the HTML files in a headless Chrome WebDriver.
+    """
+    name = "selenium"
+
+    def __init__(self, headless=True, mode="script", workers=1):
+        if mode not in selenium_modes:
+            raise ValueError(f"Unknown selenium extraction mode: {mode}")
+        self.mode = mode                               # Extraction mode (script or elements)
+        self.headless = headless                       # Run chrome in silent mode
+        self.workers = max(1, int(workers))            # Number of Chrome instances used by extract_many()
+        self.driver = None                             # WebDriver instance, started on first use by get_driver()
+
+    def get_driver(self):
+        """
+        Returns the Chrome WebDriver of the backend, starting it on first use.
+
+        Returns:
+            selenium.webdriver.Chrome: The WebDriver instance.
+        """
+        if self.driver is None:
+            options = Options()                        # Chrome driver options.
+            if self.headless:
+                options.add_argument('--headless=new') # Headless option to run chrome in silent mode.
+            self.driver = webdriver.Chrome(options)
+        return self.driver
+
+    def extract(self, file_path):
+        full_file_name = 'file://' + os.path.abspath(file_path).replace('\\', '/')
+        self.get_driver().get(full_file_name)
+        if self.mode == "script":
+            return self.extract_with_script()
+        return self.extract_with_elements()
+
+    def extract_many(self, file_paths):
+        if self.workers == 1:
+            yield from super().extract_many(file_paths)
+            return
+        # Every worker thread renders its files in its own browser, started on the first file of the thread
+        pool_backends = []
+        thread_backends = threading.local()
+        pool_lock = threading.Lock()
+
+        def extract_in_thread(file_path):
+            backend = getattr(thread_backends, 'backend', None)
+            if backend is None:
+                backend = SeleniumBackend(self.headless, self.mode)
+                thread_backends.backend = backend
+                with pool_lock:
+                    pool_backends.append(backend)
+            return extract_safely(backend.extract, file_path)
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='selenium')
+        try:
+            yield from extract_in_order(executor, extract_in_thread, file_paths, self.workers * 4)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for backend in pool_backends:
+                backend.close()
+
+    def extract_with_script(self):
+        """
+        Reads the table of the loaded page with a single execute_script call.
+
+        Returns:
+            ReportTable: The headers, rows and overall result row of the report.
+
+        Raises:
+            ValueError: If the page doesn't contain a table or the table doesn't contain any rows.
+        """
+        table = self.driver.execute_script(extract_table_script)
+        if table is None:
+            raise ValueError("No table found in the HTML file")
+        table_data = table['rows']
+        if not table_data:
+            raise ValueError("The HTML table doesn't contain any test rows")
+        # Removing the last row in the HTML (contains the test result summary[pass or fail])
+        overall_test_result = table_data.pop()
+        return ReportTable(table['headers'], table_data, overall_test_result, "selenium_script")
+
+    def extract_with_elements(self):
+        """
+        Reads the table of the loaded page with find_elements, one WebDriver call per cell.
+
+        Returns:
+            ReportTable: The headers, rows and overall result row of the report.
+        """
+        table = self.driver.find_element(By.TAG_NAME, 'table')
+        headers = table.find_elements(By.TAG_NAME, 'th')
+        headers_list = [header.text for header in headers]
+        # Getting tests data from the HTML file
+        rows = table.find_elements(By.TAG_NAME, 'tr')
+        table_data = []
+        for row in rows:
+            cells = row.find_elements(By.TAG_NAME, 'td')
+            cell_data = [cell.text for cell in cells]
+            if cell_data:
+                table_data.append(cell_data)
+        # Removing the last row in the HTML (contains the test result summary[pass or fail])
+        overall_test_result = table_data.pop()
+        return ReportTable(headers_list, table_data, overall_test_result, "selenium_elements")
+
+    def cache_key(self):
+        return f"{self.name}(mode={self.mode})"
+
+    def close(self):
+        # Only quit the browser if it was started
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
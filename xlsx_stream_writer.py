@@ -0,0 +1,404 @@
+"""
+**********************************************************************************
+File: xlsx_stream_writer.py
+
+Description:
+This module implements a minimal XLSX writer streaming the rows of a single sheet
+directly into the zip entry of the sheet (xl/worksheets/sheet1.xml), without
+creating a Python object per cell. It is used for the largest runs, where even the
+openpyxl write only mode is limited by its per cell overhead.
+
+The styles (header, data and the passed / failed highlighting of the overall result
+column, written as conditional formatting) are written once in xl/styles.xml when the
+file is created. The strings are stored in the shared strings table, every distinct
+string only once, which is written when the file is closed.
+
+Classes:
+- StreamingXlsxWriter: Writes a styled single sheet XLSX file row by row.
+
+Functions:
+- escape_text: Escapes a text for XML, removing the characters XML doesn't allow.
+- formula_string: Returns a value as a string literal of an Excel formula.
+- font_xml, fill_xml, alignment_xml: Return the XML of the fonts, fills and alignments of styles.xml.
+- build_styles_xml: Builds the content of xl/styles.xml from the header and data styles.
+
+**********************************************************************************
+"""
+
+# Imports
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from openpyxl.utils import get_column_letter
+from excel_autofit import character_widths, text_width, column_padding
+
+# Static parts of the XLSX package
+content_types_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '</Types>'
+)
+root_rels_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+workbook_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Sheet" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+workbook_rels_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '<Relationship Id="rId3" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+    'Target="sharedStrings.xml"/>'
+    '</Relationships>'
+)
+sheet_start_xml = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+)
+header_style_index = 1         # Index of the header style in the cellXfs of styles.xml
+data_style_index = 2           # Index of the data style in the cellXfs of styles.xml
+excel_max_rows = 1048576       # Maximum number of rows of an excel sheet
+rows_per_flush = 1000          # Number of rows buffered before they are written to the zip entry
+compression_level = 1          # zlib compression level of the zip entries (fastest)
+# Characters not allowed in XML 1.0 (removed from the cell texts)
+illegal_characters_pattern = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+# Functions
+def escape_text(text):
+    """
+    Escapes a text for an XML element, removing the control characters XML doesn't allow.
+
+    Args:
+        text (str): The text to escape.
+
+    Returns:
+        str: The escaped text.
+    """
+    return escape(illegal_characters_pattern.sub('', text))
+
+
+def formula_string(value):
+    """
+    Returns a value as a string literal of an Excel formula.
+
+    Args:
+        value (any): The value.
+
+    Returns:
+        str: The value between double quotes, with its double quotes doubled.
+    """
+    text = str(value).replace('"', '""')
+    return f'"{text}"'
+
+
+def font_xml(font):
+    """
+    Returns the XML of a font of styles.xml.
+
+    Args:
+        font (openpyxl.styles.Font): The font.
+
+    Returns:
+        str: The font element.
+    """
+    bold = '<b/>' if font.b else ''
+    return f'<font>{bold}<sz val="{font.size}"/><name val="{escape(font.name)}"/></font>'
+
+
+def fill_xml(fill, differential=False):
+    """
+    Returns the XML of a solid fill of styles.xml, or an empty fill.
+
+    Args:
+        fill (openpyxl.styles.PatternFill): The fill, or None.
+        differential (bool): True for the fill of a conditional format (dxf).
+
+    Returns:
+        str: The fill element.
+    """
+    if fill is None or fill.fill_type != 'solid':
+        return '<fill><patternFill patternType="none"/></fill>'
+    color = fill.fgColor.rgb
+    # Conditional formats take the color of a solid fill from the background color
+    if differential:
+        return f'<fill><patternFill patternType="solid"><bgColor rgb="{color}"/></patternFill></fill>'
+    return f'<fill><patternFill patternType="solid"><fgColor rgb="{color}"/><bgColor rgb="{color}"/></patternFill></fill>'
+
+
+def alignment_xml(alignment):
+    """
+    Returns the XML of the alignment of a cell format of styles.xml.
+
+    Args:
+        alignment (openpyxl.styles.Alignment): The alignment, or None.
+
+    Returns:
+        str: The alignment element.
+    """
+    if alignment is None:
+        return ''
+    attributes = ''
+    if alignment.horizontal:
+        attributes += f' horizontal="{alignment.horizontal}"'
+    if alignment.vertical:
+        attributes += f' vertical="{alignment.vertical}"'
+    return f'<alignment{attributes}/>'
+
+
+def build_styles_xml(header_style, data_style, highlight_fills):
+    """
+    Builds the content of xl/styles.xml: the default format, the header and data formats (also
+    registered as the named styles "Test Header" and "Test Data") and one differential format per
+    highlighted value.
+
+    Args:
+        header_style (dict): The styling options (font, alignment, fill) of the header row.
+        data_style (dict): The styling options (font, alignment, fill) of the data rows.
+        highlight_fills (list): The fills of the highlighted values, in the order of the conditional formats.
+
+    Returns:
+        str: The content of styles.xml.
+    """
+    fonts = ('<fonts count="3"><font><sz val="11"/><name val="Calibri"/></font>'
+             f'{font_xml(header_style["font"])}{font_xml(data_style["font"])}</fonts>')
+    # The fills 0 and 1 are reserved by Excel (none and gray125)
+    fills = ('<fills count="4"><fill><patternFill patternType="none"/></fill>'
+             '<fill><patternFill patternType="gray125"/></fill>'
+             f'{fill_xml(header_style.get("fill"))}{fill_xml(data_style.get("fill"))}</fills>')
+    borders = '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    header_alignment = alignment_xml(header_style.get('alignment'))
+    data_alignment = alignment_xml(data_style.get('alignment'))
+    cell_style_formats = ('<cellStyleXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/>'
+                          f'<xf numFmtId="0" fontId="1" fillId="2" borderId="0" applyAlignment="1">{header_alignment}</xf>'
+                          f'<xf numFmtId="0" fontId="2" fillId="3" borderId="0" applyAlignment="1">{data_alignment}</xf>'
+                          '</cellStyleXfs>')
+    cell_formats = ('<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+                    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="1" applyFont="1" applyFill="1" '
+                    f'applyAlignment="1">{header_alignment}</xf>'
+                    '<xf numFmtId="0" fontId="2" fillId="3" borderId="0" xfId="2" applyFont="1" applyFill="1" '
+                    f'applyAlignment="1">{data_alignment}</xf>'
+                    '</cellXfs>')
+    cell_styles = ('<cellStyles count="3"><cellStyle name="Normal" xfId="0" builtinId="0"/>'
+                   '<cellStyle name="Test Header" xfId="1"/><cellStyle name="Test Data" xfId="2"/></cellStyles>')
+    differential_formats = ''.join(f'<dxf>{fill_xml(fill, differential=True)}</dxf>' for fill in highlight_fills)
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            f'{fonts}{fills}{borders}{cell_style_formats}{cell_formats}{cell_styles}'
+            f'<dxfs count="{len(highlight_fills)}">{differential_formats}</dxfs>'
+            '</styleSheet>')
+
+
+# Classes
+class StreamingXlsxWriter:
+    """
+    Writes a single sheet XLSX file row by row, streaming the sheet XML into its zip entry.
+
+    The writer has the same interface as the Excel sessions of the worker (append_header,
+    append_rows, close) and can be used as a context manager. As with the openpyxl write only
+    mode, the column widths have to be written before the rows, so they are estimated from the
+    headers. The header row highlights the column named highlight_column with one conditional
+    format per value of highlight_fills.
+    """
+
+    def __init__(self, excel_file_name, header_style, data_style, highlight_column=None, highlight_fills=None,
+                 min_column_width=0):
+        self.header_style = header_style            # Styling options (font, alignment, fill) of the header row
+        self.highlight_column = highlight_column    # Header of the column highlighted by conditional formatting
+        self.highlight_fills = dict(highlight_fills or {})  # Highlighted cell value -> fill
+        self.min_column_width = min_column_width    # Minimum width of the columns
+        self.shared_strings = {}                    # String -> index in the shared strings table
+        self.string_count = 0                       # Number of string cells (with repetitions)
+        self.next_row = 1                           # Index of the next row of the sheet
+        self.column_letters = []                    # Letters of the columns, extended as needed
+        self.highlighted_range = None               # Range of the highlighted column
+        self.buffer = []                            # Rows XML not yet written to the zip entry
+        self.archive = zipfile.ZipFile(excel_file_name, 'w', zipfile.ZIP_DEFLATED, compresslevel=compression_level)
+        self.archive.writestr('[Content_Types].xml', content_types_xml)
+        self.archive.writestr('_rels/.rels', root_rels_xml)
+        self.archive.writestr('xl/workbook.xml', workbook_xml)
+        self.archive.writestr('xl/_rels/workbook.xml.rels', workbook_rels_xml)
+        self.archive.writestr('xl/styles.xml', build_styles_xml(header_style, data_style,
+                                                                list(self.highlight_fills.values())))
+        self.sheet_stream = None                    # Writable zip entry of the sheet, opened with the first row
+
+    def start_sheet(self, column_widths=None):
+        """
+        Opens the zip entry of the sheet and writes the column widths and the start of the sheet data.
+
+        Args:
+            column_widths (list): The width of every column, or None.
+
+        Returns:
+            None
+        """
+        self.sheet_stream = self.archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+        columns = ''
+        if column_widths:
+            columns = '<cols>' + ''.join(f'<col min="{col}" max="{col}" width="{width:.2f}" customWidth="1"/>'
+                                         for col, width in enumerate(column_widths, start=1)) + '</cols>'
+        self.sheet_stream.write(f'{sheet_start_xml}{columns}<sheetData>'.encode('utf-8'))
+
+    def cell_xml(self, reference, value, style_index):
+        """
+        Returns the XML of a cell. Strings are stored in the shared strings table.
+
+        Args:
+            reference (str): The reference of the cell (for example A2).
+            value (any): The value of the cell.
+            style_index (int): The index of the cell format in styles.xml.
+
+        Returns:
+            str: The cell element, or an empty string for an empty cell.
+        """
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return f'<c r="{reference}" s="{style_index}" t="b"><v>{int(value)}</v></c>'
+        if isinstance(value, (int, float)):
+            return f'<c r="{reference}" s="{style_index}"><v>{value}</v></c>'
+        text = str(value)
+        index = self.shared_strings.get(text)
+        if index is None:
+            index = self.shared_strings[text] = len(self.shared_strings)
+        self.string_count += 1
+        return f'<c r="{reference}" s="{style_index}" t="s"><v>{index}</v></c>'
+
+    def write_row(self, row_data, style_index):
+        """
+        Buffers the XML of a row and writes the buffer to the zip entry when it is full.
+
+        Args:
+            row_data (iterable): The values of the row cells.
+            style_index (int): The index of the cell format of the row in styles.xml.
+
+        Returns:
+            None
+        """
+        if self.sheet_stream is None:
+            self.start_sheet()
+        row_index = self.next_row
+        row_data = list(row_data)
+        column_letters = self.column_letters
+        while len(column_letters) < len(row_data):
+            column_letters.append(get_column_letter(len(column_letters) + 1))
+        cells = ''.join([self.cell_xml(f'{column_letters[col]}{row_index}', value, style_index)
+                         for col, value in enumerate(row_data)])
+        self.buffer.append(f'<row r="{row_index}">{cells}</row>')
+        self.next_row += 1
+        if len(self.buffer) >= rows_per_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows to the zip entry of the sheet.
+
+        Returns:
+            None
+        """
+        if self.buffer:
+            self.sheet_stream.write(''.join(self.buffer).encode('utf-8'))
+            self.buffer = []
+
+    def append_header(self, headers):
+        """
+        Writes the column widths (estimated from the headers) and the header row.
+
+        Args:
+            headers (list): The header names.
+
+        Returns:
+            None
+        """
+        if self.sheet_stream is None:
+            font = self.header_style['font']
+            widths = character_widths(font.name, font.size, bool(font.b))
+            self.start_sheet([max(text_width(str(header), widths, font.size), self.min_column_width) + column_padding
+                              for header in headers])
+        if self.highlight_column in headers:
+            column_letter = get_column_letter(headers.index(self.highlight_column) + 1)
+            self.highlighted_range = f'{column_letter}{self.next_row + 1}:{column_letter}{excel_max_rows}'
+        self.write_row(headers, header_style_index)
+
+    def append_rows(self, excel_data):
+        """
+        Writes data rows to the sheet.
+
+        Args:
+            excel_data (iterable): Rows of data, each row being a list of cell values.
+
+        Returns:
+            None
+        """
+        for row_data in excel_data:
+            self.write_row(row_data, data_style_index)
+
+    def close(self):
+        """
+        Finishes the sheet (conditional formats), writes the shared strings table and closes the file.
+
+        Returns:
+            None
+        """
+        if self.archive is None:
+            return
+        if self.sheet_stream is None:
+            self.start_sheet()
+        self.flush()
+        conditional_formats = ''
+        if self.highlighted_range:
+            rules = ''.join(f'<cfRule type="cellIs" dxfId="{index}" priority="{index + 1}" operator="equal">'
+                            f'<formula>{escape_text(formula_string(value))}</formula></cfRule>'
+                            for index, value in enumerate(self.highlight_fills))
+            conditional_formats = f'<conditionalFormatting sqref="{self.highlighted_range}">{rules}</conditionalFormatting>'
+        self.sheet_stream.write(f'</sheetData>{conditional_formats}</worksheet>'.encode('utf-8'))
+        self.sheet_stream.close()
+        with self.archive.open('xl/sharedStrings.xml', 'w', force_zip64=True) as strings_stream:
+            strings_stream.write(('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                                  '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                                  f'count="{self.string_count}" uniqueCount="{len(self.shared_strings)}">'
+                                  ).encode('utf-8'))
+            # The strings are written in chunks, in the order of their index
+            chunk = []
+            for text in self.shared_strings:
+                # Leading / trailing spaces and line breaks are kept only with xml:space="preserve"
+                chunk.append(f'<si><t xml:space="preserve">{escape_text(text)}</t></si>')
+                if len(chunk) >= rows_per_flush:
+                    strings_stream.write(''.join(chunk).encode('utf-8'))
+                    chunk = []
+            strings_stream.write((''.join(chunk) + '</sst>').encode('utf-8'))
+        self.archive.close()
+        self.archive = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()